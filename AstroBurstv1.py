@@ -1,12 +1,294 @@
 import pygame
 import sys
-from random import randint as r, choice, uniform as rand_uniform
+import os
+import json
+import csv
+import math
+import time
+import random
+import argparse
+import gzip
+import struct
+import subprocess
+import weakref
+import hashlib
+import mmap
+import multiprocessing
+from multiprocessing import shared_memory
 from os.path import join
+from collections import OrderedDict, deque
+import threading
+import queue
+import sqlite3
+import atexit
+import logging
+import logging.handlers
+from concurrent.futures import ThreadPoolExecutor
 import cv2
+import numpy
+try: from pygame._sdl2.video import Window, Renderer, Texture
+except ImportError: Renderer = None
+
+program_start_time = time.perf_counter()
+
+# --- Launch Options ---
+SESSION_DB_PATH = 'astroburst_sessions.db'
+ASSET_PACK_PATH = join('cache', 'assets.pack')
+arg_parser = argparse.ArgumentParser(description="AstroBurst")
+arg_parser.add_argument('--video-cache', action='store_true', help="store decoded videos under cache/video and play them from a memmap")
+arg_parser.add_argument('--headless', action='store_true', help="run the game state on SDL's dummy drivers with scripted input and report ticks per second")
+arg_parser.add_argument('--ticks', type=int, default=3600, help="simulation ticks to run in headless mode")
+arg_parser.add_argument('--dt', type=float, default=1 / 60, help="fixed simulation step in seconds for headless mode")
+arg_parser.add_argument('--tick-rate', type=float, default=60, help="gameplay simulation steps per second (the step is fixed; rendering interpolates between steps)")
+arg_parser.add_argument('--max-fps', type=int, default=60, help="cap on rendered frames per second, 0 for uncapped")
+arg_parser.add_argument('--vsync', action='store_true', help="present frames in sync with the display's refresh rate")
+arg_parser.add_argument('--backend', choices=('surface', 'sdl2', 'sdl2-software'), default='surface',
+                        help="draw with CPU Surface blits, or with an SDL2 Renderer (sdl2-software forces SDL's software renderer)")
+arg_parser.add_argument('--render-bench', type=int, default=0, metavar='FRAMES',
+                        help="render the same seeded gameplay scene for FRAMES frames with each backend and compare draw times")
+arg_parser.add_argument('--bench-window', action='store_true',
+                        help="with --headless, draw to a real window instead of SDL's dummy video driver (used by --render-bench)")
+arg_parser.add_argument('--env-bench', type=int, default=0, metavar='STEPS',
+                        help="step vectorized headless environments for STEPS steps each at 1, 2, 4, ... workers and report steps/s")
+arg_parser.add_argument('--quality', choices=('auto', 'high', 'medium', 'low'), default='auto',
+                        help="pin a render quality tier, or let the governor pick one to hold the frame budget")
+arg_parser.add_argument('--seed', type=int, default=None, help="seed for the game RNG (headless defaults to 0)")
+arg_parser.add_argument('--render', action='store_true', help="also draw each frame in headless mode")
+arg_parser.add_argument('--swarm', type=int, nargs='?', const=2000, default=0, metavar='METEORS',
+                        help="swarm mode: replace meteor sprites with a vectorized field of up to METEORS meteors (default 2000)")
+arg_parser.add_argument('--effect-budget', type=int, default=64, metavar='EFFECTS',
+                        help="most explosions and score popups alive at once; past it the oldest are recycled")
+arg_parser.add_argument('--bake-assets', action='store_true',
+                        help=f"bake every image at its runtime size and pixel format into {ASSET_PACK_PATH}, then exit")
+arg_parser.add_argument('--log-level', choices=('debug', 'info', 'warning', 'error'), default='debug',
+                        help="least severe log messages to print")
+arg_parser.add_argument('--stats-db', default=None, metavar='FILE',
+                        help=f"SQLite file that finished runs are recorded in (default {SESSION_DB_PATH}; headless runs only record with this)")
+arg_parser.add_argument('--profile', action='store_true', help="record per-phase frame timings (F3 toggles the overlay at any time)")
+arg_parser.add_argument('--profile-out', default=None, help="write the recorded frame timings to this .csv or .json file on exit")
+replay_args = arg_parser.add_mutually_exclusive_group()
+replay_args.add_argument('--record', default=None, metavar='FILE', help="record seed, dt, keys and events of this session to a replay log")
+replay_args.add_argument('--replay', default=None, metavar='FILE', help="play a replay log back and check the final score and sprite counts")
+arg_parser.add_argument('--replay-speed', choices=('realtime', 'max'), default='realtime',
+                        help="replay at 60 FPS in a window, or uncapped on the dummy drivers without drawing")
+# Imported (as the environment workers do), the game ignores the host's command line, runs headless on
+# the defaults, never opens a window and only logs warnings and errors.
+if __name__ == '__main__': launch_args = arg_parser.parse_args()
+else: launch_args = arg_parser.parse_args(['--headless', '--log-level', 'warning'])
+
+# --- Logging ---
+# Messages go to the `astroburst` logger, whose only handler puts records on a queue; a listener
+# thread formats and prints them, so a slow console never holds up a frame. They print as
+# "LEVEL: message", except run reports (REPLAY:, HEADLESS:, ...), which other tools parse and print
+# bare. stop_logging() drains the queue; it runs at exit and when an environment worker closes.
+log = logging.getLogger('astroburst')
+report_log = logging.getLogger('astroburst.report')
+
+class ConsoleFormatter(logging.Formatter):
+    def format(self, record):
+        message = super().format(record)
+        return message if record.name == report_log.name else f"{record.levelname}: {message}"
+
+log_queue = queue.SimpleQueue()
+console_handler = logging.StreamHandler(sys.stdout); console_handler.setFormatter(ConsoleFormatter())
+log_listener = logging.handlers.QueueListener(log_queue, console_handler)
+log.addHandler(logging.handlers.QueueHandler(log_queue)); log.propagate = False
+log.setLevel(launch_args.log_level.upper()); report_log.setLevel(logging.INFO)
+log_listener.start(); logging_active = True
+
+def stop_logging():
+    global logging_active
+    if logging_active: logging_active = False; log_listener.stop()
+
+atexit.register(stop_logging)
+
+# --- Render Backend Benchmark ---
+# Each backend renders the seeded headless gameplay scene in its own process (a window holds either
+# a display surface or a renderer, never both); the children report draw and present percentiles.
+# They keep the headless scripted input and fixed step but open a real window: on the dummy driver
+# every backend would be measuring the same software path.
+RENDER_BENCH_BACKENDS = ('surface', 'sdl2-software', 'sdl2')
+
+def display_driver():
+    # The video driver a window would open on, or None when there is no usable display.
+    try: pygame.display.init()
+    except pygame.error: return None
+    driver = pygame.display.get_driver(); pygame.display.quit()
+    return None if driver in ('dummy', 'offscreen') else driver
+
+def run_render_bench(frames):
+    driver = display_driver()
+    if driver is None:
+        log.error("Render bench needs a display: no video driver other than dummy/offscreen is available "
+                  f"(SDL_VIDEODRIVER={os.environ.get('SDL_VIDEODRIVER', 'unset')}).")
+        return False
+    report_log.info(f"RENDER BENCH: {frames} frames of seeded gameplay per backend on the {driver} video driver (swarm {launch_args.swarm})")
+    report_log.info(f"  {'backend':<14} {'draw p50':>9} {'draw p95':>9} {'present p50':>12} {'present p95':>12} {'ticks/s':>8} {'uploads':>8}")
+    for backend in RENDER_BENCH_BACKENDS:
+        child_args = [sys.executable, sys.argv[0], '--headless', '--bench-window', '--render', '--profile', '--seed', '0',
+                      '--ticks', str(frames), '--backend', backend, '--swarm', str(launch_args.swarm)]
+        child = subprocess.run(child_args, capture_output=True, text=True)
+        report = next((json.loads(line[len('RENDER: '):]) for line in child.stdout.splitlines() if line.startswith('RENDER: ')), None)
+        if report is None:
+            reason = (child.stderr.strip().splitlines() or ['no output'])[-1]
+            report_log.info(f"  {backend:<14} failed (exit code {child.returncode}: {reason})"); continue
+        report_log.info(f"  {report['backend']:<14} {report['draw']['p50']:>9.3f} {report['draw']['p95']:>9.3f} "
+              f"{report['flip']['p50']:>12.3f} {report['flip']['p95']:>12.3f} {report['ticks_per_s']:>8.0f} {report.get('uploads', '-'):>8}")
+
+if launch_args.render_bench:
+    sys.exit(0 if run_render_bench(launch_args.render_bench) else 1)
+
+# --- Replay Log ---
+# A gzipped stream of tagged records holding everything that can make two runs differ: the RNG
+# seed and simulation step, each frame's dt, the key state Spaceship reads, the events the loop acts on, and outcomes
+# decided outside the simulation (a video running out, a sound still playing). Replaying reads the
+# records back in the same order, checks every state transition, and compares the final score and
+# sprite counts with the ones stored at the end of the recording.
+REPLAY_MAGIC = b'ABRP'
+REPLAY_VERSION = 5
+REPLAY_HEADER = struct.Struct('<4sHQIBd')  # magic, version, seed, swarm capacity, headless, simulation step
+REPLAY_SUMMARY = struct.Struct('<dIII')   # score, meteors, lasers, sprites
+REPLAY_KEYS = (pygame.K_LEFT, pygame.K_RIGHT, pygame.K_UP, pygame.K_DOWN, pygame.K_SPACE)
+
+class ReplayLog:
+    def __init__(self, path, mode, seed=0, swarm=0, headless=False, step=1 / 60):
+        self.path = path; self.mode = mode; self.live_input = None
+        self.frames = 0; self.last_state = None; self.summary = None; self.diverged = None; self.aborted = False
+        self.started = time.perf_counter()
+        if mode == 'record':
+            self.seed, self.swarm, self.headless, self.step = seed, swarm, headless, step
+            self.file = gzip.open(path, 'wb')
+            self.file.write(REPLAY_HEADER.pack(REPLAY_MAGIC, REPLAY_VERSION, seed, swarm, headless, step))
+        else:
+            self.file = gzip.open(path, 'rb')
+            magic, version, self.seed, self.swarm, headless, self.step = REPLAY_HEADER.unpack(self.file.read(REPLAY_HEADER.size))
+            if magic != REPLAY_MAGIC or version != REPLAY_VERSION:
+                raise ValueError(f"{path} is not a version {REPLAY_VERSION} AstroBurst replay")
+            self.headless = bool(headless)
+
+    def _write(self, tag, fmt, *values):
+        self.file.write(tag + struct.pack(fmt, *values))
+
+    def _read(self, tag, fmt):
+        # A record other than the one the game asks for next means the replay has left the recording.
+        found = self.file.read(1)
+        if found != tag:
+            self.diverged = self.diverged or f"frame {self.frames}: expected record {tag!r}, found {found!r}"
+            return None
+        return struct.unpack(fmt, self.file.read(struct.calcsize(fmt)))
+
+    def _write_state(self, state):
+        encoded = str(state).encode(); self._write(b'S', f'<B{len(encoded)}s', len(encoded), encoded); self.last_state = state
+
+    def _read_state(self):
+        size = self.file.read(1)[0]
+        return self.file.read(size).decode()
+
+    def _read_until_frame(self, state):
+        # Consumes an optional state record and returns the tag that follows it.
+        tag = self.file.read(1)
+        if tag == b'S':
+            recorded = self._read_state()
+            if recorded != state: self.diverged = f"frame {self.frames}: state {state!r}, recorded {recorded!r}"; return None
+            tag = self.file.read(1)
+        if tag == b'Z': self.summary = REPLAY_SUMMARY.unpack(self.file.read(REPLAY_SUMMARY.size))
+        return tag
+
+    def frame(self, state, live_dt):
+        # Called at the top of each loop pass; returns the dt to simulate, or None once the replay is over.
+        if self.mode == 'record':
+            if state != self.last_state: self._write_state(state)
+            self._write(b'D', '<d', live_dt); self.frames += 1
+            return live_dt
+        if self.diverged or self.aborted: return None
+        tag = self._read_until_frame(state)
+        if tag == b'D':
+            self.frames += 1
+            return struct.unpack('<d', self.file.read(8))[0]
+        if tag not in (None, b'Z'): self.diverged = f"frame {self.frames}: expected a frame record, found {tag!r}"
+        return None
+
+    def events(self, live_events):
+        if self.mode == 'record':
+            logged = [event for event in live_events if event.type in (pygame.QUIT, pygame.KEYDOWN) or event.type >= pygame.USEREVENT]
+            self._write(b'E', '<H', len(logged))
+            for event in logged: self.file.write(struct.pack('<II', event.type, getattr(event, 'key', 0)))
+            return live_events
+        if any(event.type == pygame.QUIT for event in live_events):
+            self.aborted = True; return [pygame.event.Event(pygame.QUIT)]
+        count = self._read(b'E', '<H')
+        if count is None: return []
+        return [pygame.event.Event(event_type, key=key) for event_type, key in
+                (struct.unpack('<II', self.file.read(8)) for _ in range(count[0]))]
+
+    def get_pressed(self):
+        if self.mode == 'record':
+            keys = self.live_input.get_pressed()
+            self._write(b'K', '<B', sum(1 << i for i, key in enumerate(REPLAY_KEYS) if keys[key]))
+            return keys
+        mask = self._read(b'K', '<B')
+        return {key: bool(mask and mask[0] >> i & 1) for i, key in enumerate(REPLAY_KEYS)}
+
+    def flag(self, value):
+        if self.mode == 'record':
+            self._write(b'B', '<B', bool(value)); return value
+        recorded = self._read(b'B', '<B')
+        return bool(recorded and recorded[0])
+
+    def finish(self, state, summary):
+        if self.mode == 'record':
+            if state != self.last_state: self._write_state(state)
+            self.file.write(b'Z' + REPLAY_SUMMARY.pack(*summary)); self.file.close()
+            log.debug(f"Recorded {self.frames} frames to {self.path} (seed {self.seed})")
+            return True
+        if self.summary is None and not (self.diverged or self.aborted): self._read_until_frame(state)
+        self.file.close(); wall_time = max(time.perf_counter() - self.started, 1e-9)
+        report_log.info(f"REPLAY: {self.frames} frames in {wall_time:.2f}s -> {self.frames / wall_time:.0f} frames/s")
+        if self.aborted: report_log.info("REPLAY: aborted before the end of the log"); return False
+        if self.diverged: report_log.info(f"REPLAY: DIVERGED at {self.diverged}"); return False
+        expected = (round(self.summary[0], 6),) + self.summary[1:] if self.summary else None
+        actual = (round(summary[0], 6),) + tuple(summary[1:])
+        report_log.info(f"REPLAY: {'OK' if actual == expected else 'MISMATCH'} - final score/meteors/lasers/sprites {actual}, recorded {expected}")
+        return actual == expected
+
+replay_log = None
+if launch_args.replay:
+    replay_log = ReplayLog(launch_args.replay, 'replay')
+    launch_args.seed, launch_args.swarm, launch_args.headless = replay_log.seed, replay_log.swarm, replay_log.headless
+    launch_args.ticks = sys.maxsize  # a replayed headless run ends with its log
+REPLAY_UNCAPPED = replay_log is not None and launch_args.replay_speed == 'max'
+
+HEADLESS = launch_args.headless or launch_args.env_bench > 0
+# A headless tick is exactly one simulation step; a replay steps the way its recording did.
+SIM_STEP = replay_log.step if replay_log else (launch_args.dt if HEADLESS else 1.0 / launch_args.tick_rate)
+sdl_drivers = {}
+if HEADLESS or REPLAY_UNCAPPED:
+    sdl_drivers['SDL_AUDIODRIVER'] = 'dummy'
+    if not launch_args.bench_window: sdl_drivers['SDL_VIDEODRIVER'] = 'dummy'
+
+# Every gameplay random draw (spawns, shake) goes through one seedable generator. Draw-only effects
+# (text blur) use their own, so rendering on or off never shifts the gameplay sequence.
+game_seed = launch_args.seed if launch_args.seed is not None else (0 if HEADLESS else random.randrange(2**32))
+game_rng = random.Random(game_seed)
+fx_rng = random.Random(game_seed + 1)
+if launch_args.record: replay_log = ReplayLog(launch_args.record, 'record', game_seed, launch_args.swarm, HEADLESS, SIM_STEP)
+
+def replay_flag(value):
+    # Outcomes that depend on wall-clock threads (video decode, audio) are logged and replayed.
+    return replay_log.flag(value) if replay_log else value
+r, choice, rand_uniform = game_rng.randint, game_rng.choice, game_rng.uniform
 
 # Initialize pygame
+# SDL reads its drivers once, here. Imported, the module puts the host's environment back afterwards
+# so the overrides don't leak into the importing process.
+host_environ = {name: os.environ.get(name) for name in sdl_drivers}
+os.environ.update(sdl_drivers)
 pygame.init()
 pygame.mixer.init()
+if __name__ != '__main__':
+    for name, value in host_environ.items():
+        if value is None: os.environ.pop(name, None)
+        else: os.environ[name] = value
 
 # --- Path Constants (Defined Early) ---
 # Corrected paths assuming the script runs from a directory
@@ -31,23 +313,285 @@ VIDEO_PATH_GAME_OVER = join(VIDEO_BASE_PATH, 'ExitScreenMain.mp4')
 ICON_IMAGE_PATH = join(IMAGE_BASE_PATH, 'Meteor_1.png')
 
 
+# --- Render Backends ---
+# Everything on screen goes through render_backend: sprite groups, text and image blits, full-screen
+# video frames and present. `screen` is the backend's target and offers the Surface calls the game
+# draws with (blit, fblits, fill, get_size, get_rect), so drawing code runs unchanged on either one.
+class SurfaceBackend:
+    # CPU path: blits land on the display surface and only the dirty rects are presented.
+    name = 'surface'; dirty_rects = True
+
+    def __init__(self, size, title, icon=None, vsync=False):
+        self.vsync = vsync
+        try: self.screen = pygame.display.set_mode(size, pygame.SCALED if vsync else 0, vsync=int(vsync))
+        except pygame.error as e:
+            log.warning(f"Error enabling vsync: {e}. Falling back to a capped frame rate.")
+            self.screen = pygame.display.set_mode(size); self.vsync = False
+        pygame.display.set_caption(title)
+        if icon: pygame.display.set_icon(icon)
+        self.target = self.screen; self.present_ms = 0.0
+        self.video_buffers = {}  # frame size -> screen-sized Surface in the frame's pixel format
+
+    def convert(self, surf, alpha=True):
+        return surf.convert_alpha() if alpha else surf.convert()
+
+    def video_frame(self, frame):
+        # Players opened on a reduced quality tier decode below screen size. scale() only writes
+        # into a surface of the source's format, so a 24-bit frame is scaled into its own buffer
+        # and that buffer is blitted (and converted) onto the display.
+        if frame.get_size() == self.screen.get_size(): self.screen.blit(frame, (0, 0)); return
+        buffer = self.video_buffers.get(frame.get_size())
+        if buffer is None: buffer = self.video_buffers[frame.get_size()] = pygame.Surface(self.screen.get_size(), 0, frame)
+        pygame.transform.scale(frame, self.screen.get_size(), buffer)
+        self.screen.blit(buffer, (0, 0))
+
+    def draw_sprites(self, group, target):
+        return group.draw(target)
+
+    def present(self, dirty_rects=None):
+        started = time.perf_counter()
+        if dirty_rects is None: pygame.display.flip()
+        else: pygame.display.update(dirty_rects)
+        self.present_ms += (time.perf_counter() - started) * 1000
+
+    def stats(self):
+        return {}
+
+class RendererBackend:
+    # SDL2 Renderer path: each Surface is uploaded once as a static texture (kept while the Surface
+    # lives), video frames stream into one texture per frame size, and the renderer composites,
+    # rotates and scales. Meteors are drawn from their unrotated image at their exact angle, so the
+    # rotation sheets only feed collision masks. Every frame is redrawn in full.
+    dirty_rects = False
+
+    def __init__(self, size, title, icon=None, vsync=False, software=False):
+        self.name = 'sdl2-software' if software else 'sdl2'; self.size = size
+        self.window = Window(title, size)
+        if icon: self.window.set_icon(icon)
+        self.vsync = vsync
+        try: self.renderer = Renderer(self.window, accelerated=0 if software else -1, vsync=vsync)
+        except pygame.error as e:
+            log.warning(f"Error creating renderer with vsync={vsync}: {e}. Retrying without vsync.")
+            self.renderer = Renderer(self.window, accelerated=0 if software else -1); self.vsync = False
+        self.textures = weakref.WeakKeyDictionary(); self.video_textures = {}
+        self.origin = (0, 0); self.target = self; self.present_ms = 0.0
+        self.uploads = 0; self.draws = 0
+
+    def convert(self, surf, alpha=True):
+        # Pixel format conversion needs a display surface; textures are converted on upload instead.
+        return surf
+
+    def texture(self, surf):
+        texture = self.textures.get(surf)
+        if texture is None:
+            texture = self.textures[surf] = Texture.from_surface(self.renderer, surf); self.uploads += 1
+            if surf.get_flags() & pygame.SRCALPHA or surf.get_alpha() is not None: texture.blend_mode = pygame.BLENDMODE_BLEND
+        surface_alpha = surf.get_alpha()
+        texture.alpha = 255 if surface_alpha is None else surface_alpha
+        return texture
+
+    def get_size(self): return self.size
+    def get_width(self): return self.size[0]
+    def get_height(self): return self.size[1]
+    def get_rect(self): return pygame.Rect((0, 0), self.size)
+
+    def blit(self, source, dest, area=None, special_flags=0):
+        x, y = dest[0], dest[1]
+        width, height = pygame.Rect(area).size if area else source.get_size()
+        self.texture(source).draw(srcrect=area, dstrect=(x + self.origin[0], y + self.origin[1], width, height)); self.draws += 1
+        return pygame.Rect(x, y, width, height)
+
+    def fblits(self, blit_sequence):
+        for source, dest in blit_sequence: self.blit(source, dest)
+
+    def blit_rotated(self, source, scale, angle, center):
+        width, height = source.get_width() * scale, source.get_height() * scale
+        # rotozoom turns counter-clockwise, SDL's renderer clockwise.
+        self.texture(source).draw(dstrect=(center[0] - width / 2 + self.origin[0], center[1] - height / 2 + self.origin[1], width, height), angle=-angle)
+        self.draws += 1
+
+    def fill(self, color, rect=None):
+        self.renderer.draw_color = color
+        if rect is None: self.renderer.clear()
+        else: self.renderer.fill_rect(rect)
+
+    def video_frame(self, frame):
+        texture = self.video_textures.get(frame.get_size())
+        if texture is None: texture = self.video_textures[frame.get_size()] = Texture(self.renderer, frame.get_size(), streaming=True)
+        texture.update(frame); texture.draw(dstrect=(0, 0) + self.size); self.draws += 1
+
+    def draw_sprites(self, group, target=None):
+        for sprite in group.sprites():
+            if not sprite.visible: continue
+            rotated_source = getattr(sprite, 'rotated_source', None)
+            if rotated_source: self.blit_rotated(*rotated_source(), sprite.rect.center)
+            else: self.blit(sprite.image, sprite.rect)
+        return []
+
+    def present(self, dirty_rects=None):
+        started = time.perf_counter()
+        self.renderer.present()
+        self.present_ms += (time.perf_counter() - started) * 1000
+
+    def stats(self):
+        return {'uploads': self.uploads, 'textures': len(self.textures), 'draws': self.draws}
+
 # Display setup
 display_width, display_height = 1280, 720
-screen = pygame.display.set_mode((display_width, display_height))
-pygame.display.set_caption("AstroBurst")
+game_icon = None
 try:
     game_icon = pygame.image.load(ICON_IMAGE_PATH)
-    pygame.display.set_icon(game_icon)
-    print(f"DEBUG: Game icon set to {ICON_IMAGE_PATH}")
+    log.debug(f"Game icon set to {ICON_IMAGE_PATH}")
 except pygame.error as e:
-    print(f"Error loading game icon '{ICON_IMAGE_PATH}': {e}. Using default icon.")
+    log.warning(f"Error loading game icon '{ICON_IMAGE_PATH}': {e}. Using default icon.")
 except FileNotFoundError:
-    print(f"Game icon file not found: '{ICON_IMAGE_PATH}'. Using default icon.")
+    log.warning(f"Game icon file not found: '{ICON_IMAGE_PATH}'. Using default icon.")
+if launch_args.bake_assets: launch_args.backend = 'surface'  # the pack holds display-format pixels
+if launch_args.backend != 'surface' and Renderer is None:
+    log.warning("pygame._sdl2 is not available. Falling back to the surface backend."); launch_args.backend = 'surface'
+if launch_args.backend == 'surface':
+    render_backend = SurfaceBackend((display_width, display_height), "AstroBurst", game_icon, launch_args.vsync)
+else:
+    render_backend = RendererBackend((display_width, display_height), "AstroBurst", game_icon, launch_args.vsync,
+                                     software=launch_args.backend == 'sdl2-software')
+screen = render_backend.target
 
 
 clock = pygame.time.Clock()
 running = True
 
+# --- Simulation Clock ---
+# Gameplay timing reads the simulation clock (the sum of every dt) rather than SDL's wall clock,
+# so a headless run at a fixed dt plays out identically however fast it executes.
+sim_clock_ms = 0.0
+
+def game_ticks():
+    return int(sim_clock_ms)
+
+# --- Fixed Timestep ---
+# Gameplay scenes advance in steps of exactly SIM_STEP however long a frame took, so a hitch can no
+# longer move a laser or meteor far enough in one update to pass through the other. Frame time that
+# does not fill a step carries over, and the renderer draws each sprite that fraction of the way
+# between its previous and current step. A frame runs at most MAX_SUBSTEPS steps; time beyond that
+# is dropped and counted instead of snowballing into ever longer frames.
+MAX_SUBSTEPS = 5
+
+class FixedStepClock:
+    def __init__(self, step, max_substeps=MAX_SUBSTEPS):
+        self.step = step; self.max_substeps = max_substeps; self.accumulator = 0.0
+        self.frames = 0; self.steps = 0; self.dropped_steps = 0; self.clamped_frames = 0
+
+    def advance(self, frame_dt):
+        # Returns the number of steps to simulate this frame.
+        self.accumulator += frame_dt; self.frames += 1
+        due = int(self.accumulator / self.step); steps = min(due, self.max_substeps)
+        if due > steps: self.dropped_steps += due - steps; self.clamped_frames += 1
+        self.accumulator -= due * self.step; self.steps += steps
+        return steps
+
+    def reset(self):
+        self.accumulator = 0.0
+
+    @property
+    def alpha(self):
+        # How far the next step has progressed, 0..1; the renderer interpolates by it.
+        return self.accumulator / self.step
+
+    def stats(self):
+        return {'tick_rate': round(1 / self.step, 2), 'frames': self.frames, 'steps': self.steps,
+                'dropped_steps': self.dropped_steps, 'clamped_frames': self.clamped_frames}
+
+sim_stepper = FixedStepClock(SIM_STEP)
+INTERPOLATE = not HEADLESS
+
+# --- Quality Governor ---
+# Watches each frame's work time (the frame minus the time clock.tick slept and, with vsync, the
+# time present blocked waiting for vblank) and steps down a tier when the slow end of a rolling
+# window misses the frame budget, back up once it has stayed well under it. The gap between the two
+# thresholds and a cooldown after every change keep it from flapping; an upgrade that has to be
+# undone doubles the wait before the next one, and every QUALITY_BACKOFF_DECAY_FRAMES without a
+# change halves it again. Tiers only change how frames are drawn, never what is simulated, so
+# replays stay in sync.
+QUALITY_TIERS = (
+    {'name': 'high',   'text_blur': True,  'parallax': 'full',  'video_scale': 1.0},
+    {'name': 'medium', 'text_blur': False, 'parallax': 'stars', 'video_scale': 1.0},
+    {'name': 'low',    'text_blur': False, 'parallax': 'still', 'video_scale': 0.5},
+)
+QUALITY_WINDOW_FRAMES = 120
+QUALITY_SLOW_PERCENTILE = 0.9
+QUALITY_DOWNGRADE_RATIO = 1.0   # slow frames over the budget step down
+QUALITY_UPGRADE_RATIO = 0.6     # slow frames under 60% of the budget step up
+QUALITY_COOLDOWN_FRAMES = 240
+QUALITY_MAX_BACKOFF = 8
+QUALITY_BACKOFF_DECAY_FRAMES = 1800  # stable frames after which the upgrade wait halves
+
+class QualityGovernor:
+    def __init__(self, pinned=None, budget_ms=1000 / 60):
+        self.pinned = pinned; self.budget_ms = budget_ms
+        self.level = [tier['name'] for tier in QUALITY_TIERS].index(pinned) if pinned else 0
+        self.samples = deque(maxlen=QUALITY_WINDOW_FRAMES); self.since_change = 0
+        self.backoff = 1; self.last_step = 0; self.stable_frames = 0
+        self.changes = 0; self.frames_at = [0] * len(QUALITY_TIERS)
+
+    @property
+    def tier(self):
+        return QUALITY_TIERS[self.level]
+
+    def video_size(self):
+        scale = self.tier['video_scale']
+        return (int(display_width * scale), int(display_height * scale))
+
+    def observe(self, work_ms):
+        self.frames_at[self.level] += 1
+        if self.pinned: return
+        self.samples.append(work_ms); self.since_change += 1; self.stable_frames += 1
+        if self.backoff > 1 and self.stable_frames >= QUALITY_BACKOFF_DECAY_FRAMES:
+            self.backoff //= 2; self.stable_frames = 0
+        if len(self.samples) < QUALITY_WINDOW_FRAMES or self.since_change < QUALITY_COOLDOWN_FRAMES: return
+        slow_ms = sorted(self.samples)[int(QUALITY_WINDOW_FRAMES * QUALITY_SLOW_PERCENTILE)]
+        if slow_ms > self.budget_ms * QUALITY_DOWNGRADE_RATIO and self.level < len(QUALITY_TIERS) - 1:
+            if self.last_step < 0: self.backoff = min(self.backoff * 2, QUALITY_MAX_BACKOFF)
+            self.set_level(self.level + 1, slow_ms)
+        elif (slow_ms < self.budget_ms * QUALITY_UPGRADE_RATIO and self.level > 0
+              and self.since_change >= QUALITY_COOLDOWN_FRAMES * self.backoff):
+            self.set_level(self.level - 1, slow_ms)
+
+    def set_level(self, level, slow_ms):
+        global gameplay_render_target
+        log.debug(f"Quality tier {self.tier['name']} -> {QUALITY_TIERS[level]['name']} "
+              f"(p{int(QUALITY_SLOW_PERCENTILE * 100)} frame work {slow_ms:.1f} ms, budget {self.budget_ms:.1f} ms)")
+        self.last_step = level - self.level; self.level = level
+        self.samples.clear(); self.since_change = 0; self.stable_frames = 0; self.changes += 1
+        gameplay_render_target = None
+        if parallax_background: parallax_background.still_surface = None
+
+    def stats(self):
+        return {'tier': self.tier['name'], 'pinned': self.pinned is not None, 'changes': self.changes, 'backoff': self.backoff,
+                'frames_at': {tier['name']: frames for tier, frames in zip(QUALITY_TIERS, self.frames_at)}}
+
+quality = QualityGovernor(None if launch_args.quality == 'auto' else launch_args.quality,
+                          1000 / (launch_args.max_fps or 60))
+
+class ScriptedInput:
+    # Deterministic stand-in for pygame.key: sweeps left and right and taps fire every other tick.
+    def __init__(self):
+        self.tick = 0; self.keys = {}
+
+    def advance(self):
+        self.tick += 1
+        sweep = (self.tick // 90) % 3
+        self.keys = {pygame.K_LEFT: sweep == 0, pygame.K_RIGHT: sweep == 2, pygame.K_SPACE: self.tick % 2 == 0}
+
+    def get_pressed(self):
+        return self
+
+    def __getitem__(self, key):
+        return self.keys.get(key, False)
+
+scripted_input = ScriptedInput() if HEADLESS else None
+input_source = scripted_input or pygame.key
+if replay_log: replay_log.live_input = input_source; input_source = replay_log
+
 TIME_SCORE_RATE = 1
 
 # --- Game Intro Animation Constants ---
@@ -72,7 +616,13 @@ PRIMARY_TARGET_SCORE = 2000
 LEVEL_DATA = [
     {'target': PRIMARY_TARGET_SCORE, 'is_credits_trigger': True, 'credits_video_path': VIDEO_PATH_CREDITS,
      'credits_music_path': CREDITS_MUSIC_PATH,
-     'meteor_speed_multiplier': 1.0,  'meteor_spawn_rate_multiplier': 1.0}
+     'meteor_speed_multiplier': 1.0,  'meteor_spawn_rate_multiplier': 1.0,
+     # Each wave spawns `count` meteors of a size class every interval_ms from start_ms (one interval
+     # in by default) until end_ms; with ramp_ms the interval eases down to min_interval_ms.
+     'waves': [
+         {'size_class': 'normal', 'interval_ms': 900,  'score': 10},
+         {'size_class': 'fast',   'interval_ms': 1300, 'score': 20, 'speed_scale': 1.25},
+     ]}
 ]
 MAX_LEVELS = len(LEVEL_DATA)
 
@@ -86,38 +636,469 @@ current_level = 1
 target_score = LEVEL_DATA[0]['target']
 current_level_meteor_speed_multiplier = LEVEL_DATA[0]['meteor_speed_multiplier']
 current_level_meteor_spawn_rate_multiplier = LEVEL_DATA[0]['meteor_spawn_rate_multiplier']
-BASE_METEOR_SPAWN_NORMAL_INTERVAL = 900
-BASE_METEOR_SPAWN_FAST_INTERVAL = 1300
+WAVE_DEFAULTS = {'start_ms': None, 'end_ms': None, 'count': 1, 'min_interval_ms': None, 'ramp_ms': 0, 'speed_scale': 1.0}
+METEOR_SIZE_CLASSES = {'normal': (70, 90, 110), 'fast': (50, 70, 90)}  # widths a wave picks from
 
 display_level_start_text_timer = 0.0
-cap_credits_video = None
-
-# --- Video Capture Objects - Initialize all to None ---
-cap_start = None
-cap_intro_clip_1 = None
-cap_intro_clip_2 = None
-cap_game_over = None
 
+# --- Latest Intro Clip Frames ---
 latest_intro_clip_1_pygame_surface = None
 latest_intro_clip_2_pygame_surface = None
 
 
+# --- Asset Loader ---
+# Runs disk reads and decodes (images, sounds, video opens) on worker threads so the start menu can
+# show as soon as its own assets exist. Callers collect a job when a state first needs it and only
+# block if it has not finished; load and wait times are logged per asset.
+ASSET_LOADER_WORKERS = 2
+
+class AssetLoader:
+    def __init__(self, workers=ASSET_LOADER_WORKERS):
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="asset")
+        self.jobs = {}; self.load_times = {}; self.wait_times = {}; self.all_loaded_reported = False
+
+    def submit(self, name, load_fn, *args):
+        if name not in self.jobs: self.jobs[name] = self.executor.submit(self._timed_load, name, load_fn, *args)
+
+    def _timed_load(self, name, load_fn, *args):
+        start = time.perf_counter()
+        try: return load_fn(*args)
+        finally:
+            self.load_times[name] = (time.perf_counter() - start) * 1000
+            log.debug(f"Loaded '{name}' in {self.load_times[name]:.1f} ms")
+
+    def has(self, name):
+        return name in self.jobs
+
+    def ready(self, name):
+        return name in self.jobs and self.jobs[name].done()
+
+    def names(self, prefix):
+        return [name for name in self.jobs if name.startswith(prefix)]
+
+    def discard(self, name):
+        # Drops a job nobody will claim; whatever it opened (or is still opening) gets released.
+        job = self.jobs.pop(name, None)
+        if job: job.add_done_callback(self._release_result)
+
+    @staticmethod
+    def _release_result(job):
+        leftover = job.result() if not job.cancelled() and not job.exception() else None
+        if hasattr(leftover, 'release'): leftover.release()
+
+    def result(self, name):
+        job = self.jobs[name]
+        if not job.done():
+            start = time.perf_counter(); job.exception()
+            self.wait_times[name] = (time.perf_counter() - start) * 1000
+            log.debug(f"Waited {self.wait_times[name]:.1f} ms for '{name}' in state {globals().get('game_state', 'boot')}")
+        return job.result()
+
+    def take(self, name):
+        try: return self.result(name)
+        finally: self.jobs.pop(name, None)
+
+    def progress(self):
+        done = sum(job.done() for job in self.jobs.values())
+        if done == len(self.jobs) and not self.all_loaded_reported:
+            self.all_loaded_reported = True
+            log.debug(f"All queued assets loaded {(time.perf_counter() - program_start_time) * 1000:.0f} ms after launch")
+        return done, len(self.jobs)
+
+    def shutdown(self):
+        self.executor.shutdown(wait=True)
+        for job in self.jobs.values(): self._release_result(job)
+
+asset_loader = AssetLoader()
+
+def load_sound(path, volume):
+    sound = pygame.mixer.Sound(path); sound.set_volume(volume)
+    return sound
+
+def claim_loaded(name):
+    # Collects a background job that may have failed; failures are reported and yield None.
+    try: return asset_loader.result(name)
+    except (pygame.error, FileNotFoundError) as e: log.error(f"Error loading {name}: {e}"); return None
+
+# --- Audio Manager ---
+# Long-lived sounds get a reserved channel each, so "is it still playing" is one Channel lookup
+# instead of a scan over every mixer channel. Sounds can be backed by asset loader jobs and are
+# claimed on first use. Track changes at transitions crossfade onto a preloaded Sound rather than
+# reloading mixer.music, whose load() waits out any fade in progress. Calls that can block the
+# main thread (claiming an unfinished job, opening a music stream) are timed. A muted manager
+# (headless runs) loads no music and starts nothing.
+AUDIO_RESERVED_CHANNELS = ('menu', 'story', 'credits')
+AUDIO_CROSSFADE_MS = 800
+
+class AudioManager:
+    def __init__(self, channel_names=AUDIO_RESERVED_CHANNELS, muted=False):
+        pygame.mixer.set_reserved(len(channel_names))
+        self.channels = {name: pygame.mixer.Channel(i) for i, name in enumerate(channel_names)}
+        self.sounds = {}; self.jobs = {}; self.routes = {}; self.music_ready = False; self.muted = muted
+        self.blocking_ms = {}; self.blocking_calls = {}
+
+    def _timed(self, label, fn, *args):
+        start = time.perf_counter()
+        try: return fn(*args)
+        finally:
+            self.blocking_ms[label] = self.blocking_ms.get(label, 0.0) + (time.perf_counter() - start) * 1000
+            self.blocking_calls[label] = self.blocking_calls.get(label, 0) + 1
+
+    def add_sound(self, name, sound=None, job=None, channel=None):
+        self.sounds[name] = sound; self.routes[name] = channel
+        if job: self.jobs[name] = job
+
+    def sound(self, name):
+        if self.sounds.get(name) is None and name in self.jobs:
+            self.sounds[name] = self._timed(f"claim:{name}", claim_loaded, self.jobs.pop(name))
+        return self.sounds.get(name)
+
+    def prefetch(self, name):
+        # Claims a finished background load ahead of the scene that plays it; never waits.
+        if name in self.jobs and asset_loader.ready(self.jobs[name]): self.sound(name)
+
+    def play(self, name, loops=0, fade_ms=0):
+        # Returns the Channel the sound started on (its handle), or None if it is unavailable.
+        if self.muted: return None
+        sound = self.sound(name)
+        if sound is None: return None
+        channel = self.channels.get(self.routes.get(name))
+        if channel is None: return sound.play(loops=loops, fade_ms=fade_ms)
+        channel.play(sound, loops=loops, fade_ms=fade_ms)
+        return channel
+
+    def is_playing(self, name):
+        channel = self.channels.get(self.routes.get(name)); sound = self.sounds.get(name)
+        return bool(channel and sound and channel.get_busy() and channel.get_sound() == sound)
+
+    def stop(self, name, fade_ms=0):
+        if not self.is_playing(name): return
+        channel = self.channels[self.routes[name]]
+        if fade_ms: channel.fadeout(fade_ms)
+        else: channel.stop()
+
+    def load_music(self, path, volume):
+        if self.muted: return False
+        try:
+            self._timed("music.load", pygame.mixer.music.load, path)
+            pygame.mixer.music.set_volume(volume); self.music_ready = True
+            log.debug(f"Game music {path} loaded into mixer.music channel.")
+        except pygame.error as e:
+            log.error(f"Error loading game music ({path}) with pygame.mixer.music: {e}"); self.music_ready = False
+        return self.music_ready
+
+    def play_music(self, loops=-1, fade_ms=0):
+        if not self.music_ready: return False
+        self._timed("music.play", pygame.mixer.music.play, loops, 0.0, fade_ms)
+        return True
+
+    def stop_music(self, fade_ms=0):
+        if not pygame.mixer.music.get_busy(): return
+        if fade_ms: pygame.mixer.music.fadeout(fade_ms)
+        else: pygame.mixer.music.stop()
+
+    def crossfade(self, name, fade_ms=AUDIO_CROSSFADE_MS, loops=-1):
+        # Fades mixer.music and the other reserved channels out while the preloaded sound fades in.
+        self.stop_music(fade_ms)
+        for other in self.routes:
+            if other != name and self.routes[other]: self.stop(other, fade_ms)
+        return self.play(name, loops=loops, fade_ms=fade_ms)
+
+    def stats(self):
+        return {label: {'calls': self.blocking_calls[label], 'ms': round(ms, 2)} for label, ms in self.blocking_ms.items()}
+
+audio = AudioManager(muted=HEADLESS)
+
+# --- Asset Pack ---
+# `--bake-assets` writes every image the game loads into one file, already converted to the
+# display's pixel format and scaled to its runtime size, along with the collision masks built from
+# them. At launch the file is memory-mapped. Images with alpha become Surfaces straight over the
+# mapped pixels through pygame.image.frombuffer; opaque ones, whose display format frombuffer has no
+# name for, are one copy out of the map. The pack stores a hash of its sources (size and mtime of
+# each file, with the sizes it was baked at) and the display format it was baked for; if either no
+# longer matches, the game loads the loose files as before.
+ASSET_PACK_MAGIC = b'ABAP'
+ASSET_PACK_VERSION = 1
+ASSET_PACK_HEADER = struct.Struct('<4sHI')  # magic, version, index length
+ASSET_PACK_ALIGN = 64
+
+def _pack_data_start(index_size):
+    return -(-(ASSET_PACK_HEADER.size + index_size) // ASSET_PACK_ALIGN) * ASSET_PACK_ALIGN
+
+class AssetPack:
+    def __init__(self, path):
+        self.path = path; self.entries = {}; self.paths = set(); self.map = None; self.data_start = 0
+        self.frombuffer_formats = {}; self.mapped = 0; self.copied = 0; self.masks = 0
+
+    @staticmethod
+    def key(entry):
+        return (entry['path'], tuple(entry['size']) if entry['size'] else None, entry['alpha'], entry['smooth'])
+
+    @staticmethod
+    def source_hash(keys):
+        digest = hashlib.sha1(str(ASSET_PACK_VERSION).encode())
+        for key in keys:
+            stat = os.stat(key[0]); digest.update(repr((key, stat.st_size, stat.st_mtime_ns)).encode())
+        return digest.hexdigest()
+
+    @staticmethod
+    def display_format():
+        # The masks convert() and convert_alpha() produce on this display.
+        return [list(render_backend.convert(pygame.Surface((1, 1), pygame.SRCALPHA if alpha else 0), alpha).get_masks()) for alpha in (False, True)]
+
+    def open(self):
+        try:
+            with open(self.path, 'rb') as f:
+                magic, version, index_size = ASSET_PACK_HEADER.unpack(f.read(ASSET_PACK_HEADER.size))
+                if magic != ASSET_PACK_MAGIC or version != ASSET_PACK_VERSION:
+                    log.debug(f"{self.path} is not a version {ASSET_PACK_VERSION} asset pack, loading loose files."); return False
+                index = json.loads(f.read(index_size))
+                entries = {self.key(entry): entry for entry in index['entries']}
+                if index['source_hash'] != self.source_hash(entries):
+                    log.debug(f"Asset pack {self.path} is stale, loading loose files."); return False
+                if isinstance(render_backend, SurfaceBackend) and index['display_format'] != self.display_format():
+                    log.debug(f"Asset pack {self.path} was baked for another display format, loading loose files."); return False
+                self.map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY)
+        except (OSError, ValueError, KeyError, struct.error) as e:
+            log.debug(f"No usable asset pack at {self.path} ({e}), loading loose files."); return False
+        self.entries = entries; self.paths = {key[0] for key in entries}; self.data_start = _pack_data_start(index_size)
+        self.frombuffer_formats = {tuple(pygame.image.frombuffer(bytes(4), (1, 1), name).get_masks()): name for name in ('BGRA', 'RGBA', 'ARGB')}
+        return True
+
+    def _data(self, span):
+        offset, size = span
+        return memoryview(self.map)[self.data_start + offset:self.data_start + offset + size]
+
+    def surface(self, key):
+        entry = self.entries.get(key)
+        if entry is None: return None
+        size = tuple(entry['pixel_size']); masks = tuple(entry['masks']); pixels = self._data(entry['pixels'])
+        if entry['pitch'] != size[0] * 4: return None
+        name = self.frombuffer_formats.get(masks)
+        if entry['srcalpha'] and name:
+            self.mapped += 1
+            return pygame.image.frombuffer(pixels, size, name)
+        surf = pygame.Surface(size, pygame.SRCALPHA if entry['srcalpha'] else 0, 32, masks)
+        memoryview(surf.get_view('1')).cast('B')[:] = pixels; self.copied += 1
+        return surf
+
+    def mask(self, key):
+        entry = self.entries.get(key)
+        if entry is None or not entry.get('mask'): return None
+        mask = pygame.mask.Mask(tuple(entry['pixel_size'])); bits = memoryview(mask).cast('B')
+        if bits.nbytes != entry['mask'][1]: return None
+        bits[:] = self._data(entry['mask']); self.masks += 1
+        return mask
+
+    def stats(self):
+        return {'path': self.path, 'open': self.map is not None, 'images': len(self.entries),
+                'mapped': self.mapped, 'copied': self.copied, 'masks': self.masks}
+
+asset_pack = AssetPack(ASSET_PACK_PATH)
+if launch_args.bake_assets or not asset_pack.open(): asset_pack = None
+
+# --- Asset Cache ---
+# Images are loaded, converted and scaled once; sprites share the cached surface and mask.
+# prefetch() decodes a file on the asset loader; the first image() call converts it on the main thread.
+# Images and masks in the asset pack come from it instead, and their files are never read.
+class AssetCache:
+    def __init__(self, pack=None):
+        self.surfaces = {}; self.masks = {}; self.failed = {}; self.pack = pack
+        self.hits = 0; self.misses = 0; self.misses_by_state = {}; self.load_ms = 0.0
+
+    def image(self, path, size=None, alpha=True, smooth=True):
+        key = (path, size, alpha, smooth)
+        surf = self.surfaces.get(key)
+        if surf is not None:
+            self.hits += 1
+            return surf
+        if key in self.failed:
+            self.hits += 1
+            raise pygame.error(self.failed[key])
+        self.misses += 1
+        state = globals().get('game_state', 'boot')
+        self.misses_by_state[state] = self.misses_by_state.get(state, 0) + 1
+        if state == "game": log.debug(f"Asset cache miss during gameplay: {path} {size}")
+        started = time.perf_counter()
+        surf = self.pack.surface(key) if self.pack else None
+        try:
+            if surf is None:
+                surf = asset_loader.take(f"image:{path}") if asset_loader.has(f"image:{path}") else pygame.image.load(path)
+                surf = render_backend.convert(surf, alpha)
+                if size: surf = (pygame.transform.smoothscale if smooth else pygame.transform.scale)(surf, size)
+        except (pygame.error, FileNotFoundError) as e:
+            self.failed[key] = str(e)
+            raise pygame.error(str(e))
+        finally: self.load_ms += (time.perf_counter() - started) * 1000
+        self.surfaces[key] = surf
+        return surf
+
+    def mask(self, path, size=None, alpha=True, smooth=True):
+        key = (path, size, alpha, smooth)
+        mask = self.masks.get(key)
+        if mask is not None:
+            self.hits += 1
+            return mask
+        mask = self.pack.mask(key) if self.pack else None
+        if mask is None: mask = pygame.mask.from_surface(self.image(path, size, alpha, smooth))
+        self.masks[key] = mask
+        return mask
+
+    def prefetch(self, path):
+        if self.pack and path in self.pack.paths: return
+        asset_loader.submit(f"image:{path}", pygame.image.load, path)
+
+    def frames(self, paths, size=None):
+        return [self.image(path, size) for path in paths]
+
+    def stats(self):
+        return {'hits': self.hits, 'misses': self.misses, 'misses_by_state': dict(self.misses_by_state),
+                'surfaces': len(self.surfaces), 'masks': len(self.masks), 'load_ms': round(self.load_ms, 1)}
+
+asset_cache = AssetCache(asset_pack)
+PLAYER_IMAGE_PATH = join(IMAGE_BASE_PATH, 'player.png')
+LASER_IMAGE_PATH = join(IMAGE_BASE_PATH, 'laser.png')
+LASER_IMAGE_SIZE = (50, 50)
+
+# --- Rotation Cache ---
+# Meteors pick a pre-rotated frame (and its mask) from a per-(surface, scale) sheet instead of
+# calling rotozoom + mask.from_surface every frame. Sheets fill lazily and are evicted LRU.
+ROTATION_STEPS = 64
+ROTATION_CACHE_MAX_BYTES = 96 * 1024 * 1024
+
+class RotationCache:
+    def __init__(self, steps=ROTATION_STEPS, max_bytes=ROTATION_CACHE_MAX_BYTES):
+        self.steps = steps; self.max_bytes = max_bytes
+        self.sheets = OrderedDict(); self.bytes_used = 0
+        self.hits = 0; self.misses = 0; self.evictions = 0
+
+    def bucket(self, angle):
+        return int(round(angle * self.steps / 360.0)) % self.steps
+
+    def frame(self, surf, scale, bucket):
+        key = (surf, round(scale, 3))
+        sheet = self.sheets.get(key)
+        if sheet is None:
+            sheet = self.sheets[key] = {'frames': [None] * self.steps, 'bytes': 0}
+        else:
+            self.sheets.move_to_end(key)
+        entry = sheet['frames'][bucket]
+        if entry is not None:
+            self.hits += 1
+            return entry
+        self.misses += 1
+        image = pygame.transform.rotozoom(surf, bucket * 360.0 / self.steps, scale)
+        entry = sheet['frames'][bucket] = (image, pygame.mask.from_surface(image))
+        frame_bytes = image.get_width() * image.get_height() * (image.get_bytesize() + 0.125)
+        sheet['bytes'] += frame_bytes; self.bytes_used += frame_bytes
+        while self.bytes_used > self.max_bytes and len(self.sheets) > 1:
+            _, evicted = self.sheets.popitem(last=False)
+            self.bytes_used -= evicted['bytes']; self.evictions += 1
+        return entry
+
+    def missing(self, surf, scale):
+        # Buckets of a sheet that have not been rendered yet.
+        sheet = self.sheets.get((surf, round(scale, 3)))
+        return [bucket for bucket in range(self.steps) if sheet is None or sheet['frames'][bucket] is None]
+
+    def stats(self):
+        return {'hits': self.hits, 'misses': self.misses, 'evictions': self.evictions,
+                'sheets': len(self.sheets), 'mbytes': round(self.bytes_used / (1024 * 1024), 2)}
+
+rotation_cache = RotationCache()
+
+# --- Collision Broadphase ---
+# Uniform grid rebuilt every tick from the meteor group; only sprites sharing a cell reach the
+# rect -> circle -> mask narrowphase. Counters compare candidate pairs against confirmed hits.
+COLLISION_CELL_SIZE = 128
+COLLISION_SLACK = 1.5  # collide_mask truncates sub-pixel offsets, so the coarse tests stay slightly loose
+
+class SpatialHash:
+    def __init__(self, cell_size=COLLISION_CELL_SIZE):
+        self.cell_size = cell_size; self.cells = {}
+        self.ticks = 0; self.candidate_pairs = 0; self.rect_passes = 0; self.circle_passes = 0; self.confirmed_hits = 0
+
+    def _cells_for(self, rect):
+        cs = self.cell_size
+        for cx in range(int((rect.left - COLLISION_SLACK) // cs), int((rect.right + COLLISION_SLACK) // cs) + 1):
+            for cy in range(int((rect.top - COLLISION_SLACK) // cs), int((rect.bottom + COLLISION_SLACK) // cs) + 1):
+                yield cx, cy
+
+    def rebuild(self, sprites):
+        self.cells.clear(); self.ticks += 1
+        for sprite in sprites:
+            for cell in self._cells_for(sprite.rect):
+                bucket = self.cells.get(cell)
+                if bucket is None: self.cells[cell] = [sprite]
+                else: bucket.append(sprite)
+
+    def nearby(self, rect):
+        found = {}
+        for cell in self._cells_for(rect):
+            for sprite in self.cells.get(cell, ()): found[sprite] = None
+        return found
+
+    def narrowphase(self, a, b):
+        self.candidate_pairs += 1
+        dx = a.rect.centerx - b.rect.centerx; dy = a.rect.centery - b.rect.centery
+        if abs(dx) * 2 > a.rect.width + b.rect.width + 2 * COLLISION_SLACK: return False
+        if abs(dy) * 2 > a.rect.height + b.rect.height + 2 * COLLISION_SLACK: return False
+        self.rect_passes += 1
+        radius_a = getattr(a, 'radius', None) or math.hypot(a.rect.width, a.rect.height) / 2
+        radius_b = getattr(b, 'radius', None) or math.hypot(b.rect.width, b.rect.height) / 2
+        if dx * dx + dy * dy > (radius_a + radius_b + COLLISION_SLACK) ** 2: return False
+        self.circle_passes += 1
+        if not pygame.sprite.collide_mask(a, b): return False
+        self.confirmed_hits += 1
+        return True
+
+    def groupcollide(self, group_a, dokill_a, dokill_b):
+        # Same result shape and kill semantics as pygame.sprite.groupcollide against the hashed group.
+        collisions = {}
+        for a in group_a.sprites():
+            hit = [b for b in self.nearby(a.rect) if b.alive() and self.narrowphase(a, b)]
+            if hit:
+                if dokill_b:
+                    for b in hit: b.kill()
+                if dokill_a: a.kill()
+                collisions[a] = hit
+        return collisions
+
+    def spritecollideany(self, sprite):
+        for other in self.nearby(sprite.rect):
+            if other.alive() and self.narrowphase(sprite, other): return other
+        return None
+
+    def stats(self):
+        return {'ticks': self.ticks, 'candidate_pairs': self.candidate_pairs, 'rect_passes': self.rect_passes,
+                'circle_passes': self.circle_passes, 'confirmed_hits': self.confirmed_hits}
+
+collision_grid = SpatialHash()
+
+
 # --- Sprite groups ---
-all_sprites = pygame.sprite.Group()
+# all_sprites is drawn back to front by layer and only repaints the regions that changed.
+# The background, stars and planets are drawn beneath it by ParallaxBackground, and effects
+# between the player and the HUD by EffectSystem (see draw_effects).
+LAYER_METEORS, LAYER_LASERS, LAYER_TRAIL, LAYER_PLAYER, LAYER_HUD = range(5)
+all_sprites = pygame.sprite.LayeredDirty()
 meteor_sprites = pygame.sprite.Group()
 laser_sprites = pygame.sprite.Group()
 player_group = pygame.sprite.GroupSingle()
 tail_group = pygame.sprite.GroupSingle()
 
-class Spaceship(pygame.sprite.Sprite):
+class Spaceship(pygame.sprite.DirtySprite):
     def __init__(self, groups, start_mode="normal"):
-        super().__init__(groups)
+        self._layer = LAYER_PLAYER
+        super().__init__(groups); self.dirty = 2
         try:
-            self.image_original = pygame.image.load(join(IMAGE_BASE_PATH, 'player.png')).convert_alpha()
+            self.image_original = asset_cache.image(PLAYER_IMAGE_PATH)
+            self.mask = asset_cache.mask(PLAYER_IMAGE_PATH)
         except pygame.error as e:
-            print(f"Error loading player image: {e}. Using fallback surface.")
+            log.warning(f"Error loading player image: {e}. Using fallback surface.")
             self.image_original = pygame.Surface((50,40), pygame.SRCALPHA)
             self.image_original.fill((0,255,0))
+            self.mask = pygame.mask.from_surface(self.image_original)
         self.image = self.image_original
 
         self.normal_start_y = PLAYER_NORMAL_START_Y
@@ -133,7 +1114,6 @@ class Spaceship(pygame.sprite.Sprite):
         self.direction = pygame.Vector2()
         self.base_speed = 300
         self.speed = self.base_speed
-        self.mask = pygame.mask.from_surface(self.image)
         self.laser_active = False
         self.last_shot_time = 0
         self.laser_cooldown = 300
@@ -142,7 +1122,7 @@ class Spaceship(pygame.sprite.Sprite):
         global game_state, game_intro_start_time
 
         if self.is_in_intro_animation and game_state == "game_intro_animation":
-            elapsed_intro_time = (pygame.time.get_ticks() / 1000.0) - game_intro_start_time
+            elapsed_intro_time = (game_ticks() / 1000.0) - game_intro_start_time
             if elapsed_intro_time < GAME_INTRO_DURATION:
                 progress = min(1.0, elapsed_intro_time / GAME_INTRO_DURATION)
                 self.rect.centery = self.intro_anim_start_y + (self.normal_start_y - self.intro_anim_start_y) * progress
@@ -153,7 +1133,7 @@ class Spaceship(pygame.sprite.Sprite):
                 self.is_in_intro_animation = False
             return
 
-        keys = pygame.key.get_pressed()
+        keys = input_source.get_pressed()
         self.direction.x = int(keys[pygame.K_RIGHT]) - int(keys[pygame.K_LEFT])
         self.direction.y = int(keys[pygame.K_DOWN]) - int(keys[pygame.K_UP])
 
@@ -163,81 +1143,116 @@ class Spaceship(pygame.sprite.Sprite):
         self.rect.center += self.direction * self.speed * dt
         self.rect.clamp_ip(screen.get_rect())
 
-        current_time = pygame.time.get_ticks()
+        current_time = game_ticks()
         if keys[pygame.K_SPACE]:
             if not self.laser_active and (current_time - self.last_shot_time > self.laser_cooldown):
-                Laser(self.rect.midtop, (all_sprites, laser_sprites))
-                if 'laser_sound' in globals() and laser_sound:
-                    laser_sound.play()
+                laser_pool.acquire(self.rect.midtop, (all_sprites, laser_sprites))
+                audio.play('laser')
                 self.laser_active = True
                 self.last_shot_time = current_time
         else:
             self.laser_active = False
 
-class Laser(pygame.sprite.Sprite):
-    def __init__(self, position, groups):
-        super().__init__(groups)
+# --- Sprite Pools ---
+# Short-lived sprites are recycled: kill() hands a PooledSprite back to its pool and acquire()
+# re-spawns a free one (or builds a new one when the pool is dry). Pools pre-warm in setup_game.
+POOL_SIZES = {'Laser': 16, 'Meteor': 48}
+
+class PooledSprite(pygame.sprite.DirtySprite):
+    pool = None; pooled = False
+
+    def kill(self):
+        super().kill()
+        if self.pool: self.pool.release(self)
+
+class SpritePool:
+    def __init__(self, sprite_class, size):
+        self.sprite_class = sprite_class; self.size = size; self.free = []
+        self.created = 0; self.reused = 0; self.in_use = 0; self.high_water = 0
+
+    def _build(self):
+        sprite = self.sprite_class(); sprite.pool = self; self.created += 1
+        return sprite
+
+    def prewarm(self):
+        while self.created < self.size:
+            sprite = self._build(); sprite.pooled = True; self.free.append(sprite)
+
+    def acquire(self, *args):
+        if self.free: sprite = self.free.pop(); self.reused += 1
+        else: sprite = self._build()
+        sprite.pooled = False; sprite.prev_center = None
+        self.in_use += 1; self.high_water = max(self.high_water, self.in_use)
+        sprite.spawn(*args)
+        return sprite
+
+    def release(self, sprite):
+        if sprite.pooled: return
+        sprite.pooled = True; self.in_use -= 1; self.free.append(sprite)
+
+    def stats(self):
+        return {'size': self.size, 'created': self.created, 'reused': self.reused, 'in_use': self.in_use, 'high_water': self.high_water}
+
+class Laser(PooledSprite):
+    def __init__(self, position=None, groups=()):
+        self._layer = LAYER_LASERS
+        super().__init__(); self.dirty = 2; self.speed = 700
+        if position is not None: self.spawn(position, groups)
+
+    def spawn(self, position, groups):
         try:
-            original_laser_image = pygame.image.load(join(IMAGE_BASE_PATH, 'laser.png')).convert_alpha()
-            new_width = 50; new_height = 50
-            self.image = pygame.transform.smoothscale(original_laser_image, (new_width, new_height))
+            self.image = asset_cache.image(LASER_IMAGE_PATH, LASER_IMAGE_SIZE)
+            self.mask = asset_cache.mask(LASER_IMAGE_PATH, LASER_IMAGE_SIZE)
         except pygame.error as e:
-            print(f"Error loading laser image: {e}. Using fallback surface.")
+            log.warning(f"Error loading laser image: {e}. Using fallback surface.")
             self.image = pygame.Surface((10,30), pygame.SRCALPHA); self.image.fill((255,0,0))
-        
+            self.mask = pygame.mask.from_surface(self.image)
         self.rect = self.image.get_frect(midbottom=position)
-        self.mask = pygame.mask.from_surface(self.image)
-        self.speed = 700
+        self.add(groups)
+
     def update(self, dt): self.rect.y -= self.speed * dt; _ = self.kill() if self.rect.bottom < 0 else None
 
-class Meteor(pygame.sprite.Sprite):
-    def __init__(self, surf, position, scale_tuple, score_value, speed_multiplier, groups):
-        super().__init__(groups)
+class Meteor(PooledSprite):
+    def __init__(self, surf=None, position=None, width=0, score_value=0, speed=0, heading=0, rotation_speed=0, groups=()):
+        self._layer = LAYER_METEORS
+        super().__init__(); self.dirty = 2; self.direction = pygame.Vector2()
+        if surf is not None: self.spawn(surf, position, width, score_value, speed, heading, rotation_speed, groups)
+
+    def spawn(self, surf, position, width, score_value, speed, heading, rotation_speed, groups):
+        # Every random draw was made when the wave schedule was compiled; see WaveScheduler.
         self.original_surface = surf
-        self.image = pygame.transform.smoothscale(self.original_surface, scale_tuple)
+        self.rotozoom_scale = width / self.original_surface.get_width() if self.original_surface.get_width() > 0 else 1.0
+        self.rotation_bucket = 0
+        self.image, self.mask = rotation_cache.frame(self.original_surface, self.rotozoom_scale, self.rotation_bucket)
         self.rect = self.image.get_frect(center=position)
-        self.mask = pygame.mask.from_surface(self.image)
-        self.direction = pygame.Vector2(rand_uniform(-0.5, 0.5), 1).normalize()
-        self.base_speed = (r(150, 300) + current_meteor_base_speed_offset) * speed_multiplier
+        self.radius = math.hypot(*self.original_surface.get_size()) * self.rotozoom_scale / 2
+        self.direction.update(heading, 1); self.direction.normalize_ip()
+        self.base_speed = speed
         self.current_speed = self.base_speed
-        self.rotation_speed = r(20, 70); self.rotation = 0
-        self.rotozoom_scale = self.rect.width / self.original_surface.get_width() if self.original_surface.get_width() > 0 else 1.0
+        self.rotation_speed = rotation_speed; self.rotation = 0
         self.score_value = score_value
+        self.add(groups)
+
+    def rotated_source(self):
+        # For backends that rotate while drawing: the unrotated image, its scale and the exact angle.
+        return self.original_surface, self.rotozoom_scale, self.rotation
 
     def update(self, dt):
         self.rect.center += self.direction * self.current_speed * dt
         self.rotation += self.rotation_speed * dt
-        old_center = self.rect.center
-        self.image = pygame.transform.rotozoom(self.original_surface, self.rotation, self.rotozoom_scale)
-        self.rect = self.image.get_frect(center=old_center)
-        self.mask = pygame.mask.from_surface(self.image)
+        bucket = rotation_cache.bucket(self.rotation)
+        if bucket != self.rotation_bucket:
+            self.rotation_bucket = bucket
+            old_center = self.rect.center
+            self.image, self.mask = rotation_cache.frame(self.original_surface, self.rotozoom_scale, bucket)
+            self.rect = self.image.get_frect(center=old_center)
         if self.rect.top > display_height + 50 or self.rect.right < -50 or self.rect.left > display_width + 50:
             self.kill()
 
-class LoopingObject(pygame.sprite.Sprite):
-    def __init__(self, surf, new_top_y_on_reset, pos, speed, groups):
-        super().__init__(groups); self.image = surf; self.rect = self.image.get_frect(topleft=pos)
-        self.base_speed = speed
-        self.current_speed = speed
-        self.reset_y = new_top_y_on_reset
-    def update(self, dt):
-        self.rect.y += self.current_speed * dt
-        if self.rect.top >= display_height: self.rect.top = self.reset_y
-
-class AnimatedExplosion(pygame.sprite.Sprite):
-    def __init__(self, frames, pos, groups):
-        super().__init__(groups); self.frames = frames; self.frame_index = 0
-        if not self.frames: self.image = pygame.Surface((1,1)); self.kill(); return
-        self.image = self.frames[self.frame_index]; self.rect = self.image.get_frect(center=pos)
-        self.animation_speed = 25
-    def update(self, dt):
-        if not self.frames: self.kill(); return
-        self.frame_index += self.animation_speed * dt
-        self.image = self.frames[int(self.frame_index)] if self.frame_index < len(self.frames) else self.kill()
-
-class Spaceshiptail(pygame.sprite.Sprite):
+class Spaceshiptail(pygame.sprite.DirtySprite):
     def __init__(self, frames, player_ref, groups):
-        super().__init__(groups); self.player = player_ref; self.frames = frames; self.frame_index = 0
+        self._layer = LAYER_TRAIL
+        super().__init__(groups); self.dirty = 2; self.player = player_ref; self.frames = frames; self.frame_index = 0
         if not self.frames: self.image = pygame.Surface((1,1)); self.kill(); return
         self.image = self.frames[self.frame_index]
         self.offset_y = self.image.get_height() / 2 - 10
@@ -249,123 +1264,462 @@ class Spaceshiptail(pygame.sprite.Sprite):
         self.frame_index += self.animation_speed * dt
         self.image = self.frames[int(self.frame_index) % len(self.frames)]
 
-class ScorePopup(pygame.sprite.Sprite):
-    def __init__(self, text, position, font, color, duration_ms, upward_speed, groups):
-        super().__init__(groups); self.font = font
-        self.image_original = self.font.render(text, True, color); self.image = self.image_original.copy()
-        self.rect = self.image.get_rect(center=position)
-        self.creation_time = pygame.time.get_ticks(); self.duration_ms = duration_ms
-        self.upward_speed = upward_speed; self.initial_alpha = 255; self.image.set_alpha(self.initial_alpha)
+laser_pool = SpritePool(Laser, POOL_SIZES['Laser'])
+meteor_pool = SpritePool(Meteor, POOL_SIZES['Meteor'])
+sprite_pools = [laser_pool, meteor_pool]
+
+# --- Meteor Swarm ---
+# Swarm mode keeps every meteor in NumPy arrays (position, velocity, angle, spin, size variant,
+# score) and moves, rotates and culls the whole field in one vectorized step per tick. Sizes are
+# quantised to a few variants whose rotation sheets are baked on reset, so a frame is one fblits.
+# Collisions run a vectorized circle test per laser and confirm the candidates with masks.
+SWARM_SIZE_VARIANTS = (40, 55, 70, 90)
+SWARM_RAMP_SECONDS = 20.0     # time for the field to grow from empty to full capacity
+SWARM_REFILL_SECONDS = 3.0    # a full field's worth of meteors enters over this long at most
+SWARM_FAST_SHARE = 0.2
+
+class MeteorSwarm:
+    def __init__(self, capacity=0):
+        self.capacity = capacity; self.active = capacity > 0; self.spawning = False
+        self.count = 0; self.elapsed = 0.0; self.spawn_carry = 0.0; self.np_rng = None
+        self.pos = numpy.zeros((capacity, 2), numpy.float32); self.vel = numpy.zeros((capacity, 2), numpy.float32)
+        self.prev_pos = numpy.zeros((capacity, 2), numpy.float32)
+        self.angle = numpy.zeros(capacity, numpy.float32); self.spin = numpy.zeros(capacity, numpy.float32)
+        self.variant = numpy.zeros(capacity, numpy.intp); self.score = numpy.zeros(capacity, numpy.int32)
+        self.frames = []; self.masks = []; self.half_sizes = None; self.radii = None; self.sources = []
+        self.spawned = 0; self.culled = 0; self.candidates = 0; self.hits = 0; self.peak = 0
+
+    def reset(self, surfaces):
+        self.count = 0; self.elapsed = 0.0; self.spawn_carry = 0.0; self.spawning = False
+        self.np_rng = numpy.random.default_rng(game_rng.getrandbits(64))
+        if self.frames or not surfaces: return
+        # Flat sheet index is variant * ROTATION_STEPS + bucket for frames, masks and half sizes.
+        half_sizes = []; radii = []
+        for surf in surfaces:
+            for size in SWARM_SIZE_VARIANTS:
+                scale = size / surf.get_width() if surf.get_width() > 0 else 1.0
+                for bucket in range(rotation_cache.steps):
+                    image, mask = rotation_cache.frame(surf, scale, bucket)
+                    self.frames.append(image); self.masks.append(mask); half_sizes.append((image.get_width() / 2, image.get_height() / 2))
+                radii.append(math.hypot(*surf.get_size()) * scale / 2); self.sources.append((surf, scale))
+        self.half_sizes = numpy.array(half_sizes, numpy.float32); self.radii = numpy.array(radii, numpy.float32)
+
+    def clear(self):
+        self.count = 0; self.spawning = False
+
+    def _spawn(self, k):
+        k = min(k, self.capacity - self.count)
+        if k <= 0 or self.radii is None: return
+        rng = self.np_rng; s = slice(self.count, self.count + k)
+        self.pos[s, 0] = rng.uniform(50, display_width - 50, k); self.pos[s, 1] = rng.uniform(-250, -80, k)
+        heading = rng.uniform(-0.5, 0.5, k); norm = numpy.hypot(heading, 1.0)
+        fast = rng.random(k) < SWARM_FAST_SHARE
+        speed = (rng.uniform(150, 300, k) + current_meteor_base_speed_offset) * current_level_meteor_speed_multiplier * numpy.where(fast, 1.25, 1.0)
+        self.vel[s, 0] = heading / norm * speed; self.vel[s, 1] = speed / norm
+        self.angle[s] = 0; self.spin[s] = rng.uniform(20, 70, k)
+        self.variant[s] = rng.integers(0, len(self.radii), k); self.score[s] = numpy.where(fast, 20, 10)
+        self.count += k; self.spawned += k; self.peak = max(self.peak, self.count)
+
+    def _compact(self, keep):
+        n = self.count; kept = int(keep.sum())
+        for array in (self.pos, self.prev_pos, self.vel, self.angle, self.spin, self.variant, self.score):
+            array[:kept] = array[:n][keep]
+        self.count = kept
+
+    def _sheet_indices(self):
+        n = self.count; steps = rotation_cache.steps
+        return self.variant[:n] * steps + numpy.rint(self.angle[:n] * (steps / 360.0)).astype(numpy.intp) % steps
+
+    def update(self, dt):
+        if not self.active: return
+        if self.spawning:
+            self.elapsed += dt
+            target = int(self.capacity * min(1.0, self.elapsed / SWARM_RAMP_SECONDS))
+            self.spawn_carry = min(self.spawn_carry + self.capacity / SWARM_REFILL_SECONDS * dt, self.capacity)
+            k = min(target - self.count, int(self.spawn_carry))
+            if k > 0: self._spawn(k); self.spawn_carry -= k
+        n = self.count
+        if not n: return
+        pos = self.pos[:n]; self.prev_pos[:n] = pos
+        pos += self.vel[:n] * dt; self.angle[:n] += self.spin[:n] * dt
+        reach = self.radii[self.variant[:n]]
+        keep = (pos[:, 1] - reach <= display_height + 50) & (pos[:, 0] + reach >= -50) & (pos[:, 0] - reach <= display_width + 50)
+        if not keep.all(): self.culled += n - int(keep.sum()); self._compact(keep)
+
+    def draw(self, surface, alpha=1.0):
+        if not self.count: return
+        sheet = self._sheet_indices(); frames = self.frames; pos = self.pos[:self.count]
+        if alpha < 1.0: pos = pos + (pos - self.prev_pos[:self.count]) * (alpha - 1.0)
+        if hasattr(surface, 'blit_rotated'):
+            sources = self.sources
+            for variant, angle, center in zip(self.variant[:self.count].tolist(), self.angle[:self.count].tolist(), pos.tolist()):
+                surface.blit_rotated(*sources[variant], angle, center)
+            return
+        topleft = pos - self.half_sizes[sheet]
+        surface.fblits([(frames[i], xy) for i, xy in zip(sheet.tolist(), topleft.tolist())])
+
+    def _hits_for(self, sprite, alive, sheet, first_only=False):
+        # Circle test against the whole field, then collide_mask-style confirmation on the few candidates.
+        n = self.count; cx, cy = sprite.rect.center
+        reach = math.hypot(sprite.rect.width, sprite.rect.height) / 2 + COLLISION_SLACK
+        d2 = (self.pos[:n, 0] - cx) ** 2 + (self.pos[:n, 1] - cy) ** 2
+        candidates = numpy.flatnonzero(alive & (d2 <= (self.radii[self.variant[:n]] + reach) ** 2))
+        self.candidates += len(candidates); hits = []
+        for i in candidates.tolist():
+            left, top = self.pos[i] - self.half_sizes[sheet[i]]
+            if sprite.mask.overlap(self.masks[sheet[i]], (int(left - sprite.rect.x), int(top - sprite.rect.y))):
+                hits.append(i)
+                if first_only: break
+        self.hits += len(hits)
+        return hits
+
+    def collide_lasers(self, lasers):
+        # Mirrors SpatialHash.groupcollide(lasers, True, True): returns {laser: [(center, score_value), ...]}.
+        collisions = {}
+        if not self.count or not lasers: return collisions
+        alive = numpy.ones(self.count, bool); sheet = self._sheet_indices()
+        for laser in lasers.sprites():
+            hits = self._hits_for(laser, alive, sheet)
+            if hits:
+                alive[hits] = False; laser.kill()
+                collisions[laser] = [(tuple(self.pos[i].tolist()), int(self.score[i])) for i in hits]
+        if collisions: self._compact(alive)
+        return collisions
+
+    def collide_sprite(self, sprite):
+        if not self.count: return False
+        return bool(self._hits_for(sprite, numpy.ones(self.count, bool), self._sheet_indices(), first_only=True))
+
+    def stats(self):
+        return {'capacity': self.capacity, 'count': self.count, 'peak': self.peak, 'spawned': self.spawned,
+                'culled': self.culled, 'candidates': self.candidates, 'hits': self.hits}
+
+meteor_swarm = MeteorSwarm(launch_args.swarm)
+
+# --- Effects ---
+# Explosions and score popups live in flat NumPy arrays (sheet, cell, top-left, age, rise speed)
+# instead of one sprite each. A tick ages, moves and culls every effect in one vectorized pass and
+# a frame draws them in one fblits, above every sprite but the HUD. A sheet is an effect's images:
+# explosion frames, or fades of a popup's text built one alpha at a time on first use; the cell
+# picks the frame or alpha. Ages and positions advance exactly as the old sprites' did (frames per
+# step, whole ms and whole pixels for popups), so effects look the same. Effects stay in spawn
+# order, so once the budget is full each new one recycles the oldest.
+EXPLOSION_FRAME_RATE = 25      # explosion frames per second
+POPUP_DURATION_MS = 1000       # popups rise for this long and fade over the second half
+POPUP_RISE_SPEED = 70
+
+class EffectSystem:
+    def __init__(self, capacity):
+        self.capacity = max(capacity, 1); self.count = 0
+        self.sheet = numpy.zeros(self.capacity, numpy.intp); self.cell = numpy.zeros(self.capacity, numpy.intp)
+        self.fades = numpy.zeros(self.capacity, bool)
+        self.pos = numpy.zeros((self.capacity, 2), numpy.float32); self.prev_pos = numpy.zeros((self.capacity, 2), numpy.float32)
+        self.size = numpy.zeros((self.capacity, 2), numpy.float32)
+        # Age is frames shown for explosions and ms since game_ticks() at spawn for popups; it ends at `limit`.
+        self.age = numpy.zeros(self.capacity); self.born = numpy.zeros(self.capacity, numpy.int64)
+        self.limit = numpy.zeros(self.capacity); self.rise = numpy.zeros(self.capacity)
+        self.sheets = []; self.sheet_sources = []; self.sheet_ids = {}; self.drawn_rects = []
+        self.spawned = 0; self.recycled = 0; self.peak = 0
+
+    def _sheet_for(self, source, fades):
+        index = self.sheet_ids.get(id(source))
+        if index is None:
+            index = self.sheet_ids[id(source)] = len(self.sheets)
+            self.sheets.append([None] * 256 if fades else list(source)); self.sheet_sources.append(source)
+        return index
+
+    def _spawn(self, source, fades, topleft, size, limit, rise):
+        if self.count == self.capacity:
+            keep = numpy.ones(self.count, bool); keep[0] = False; self._compact(keep); self.recycled += 1
+        i = self.count
+        self.sheet[i] = self._sheet_for(source, fades); self.cell[i] = 255 if fades else 0; self.fades[i] = fades
+        self.pos[i] = topleft; self.prev_pos[i] = topleft; self.size[i] = size
+        self.age[i] = 0.0; self.born[i] = game_ticks(); self.limit[i] = limit; self.rise[i] = rise
+        self.count += 1; self.spawned += 1; self.peak = max(self.peak, self.count)
+
+    def explosion(self, frames, center):
+        if not frames: return
+        rect = frames[0].get_frect(center=center)
+        self._spawn(frames, False, rect.topleft, rect.size, len(frames), 0.0)
+
+    def popup(self, text_surf, center):
+        rect = text_surf.get_rect(center=center)
+        self._spawn(text_surf, True, rect.topleft, rect.size, POPUP_DURATION_MS, POPUP_RISE_SPEED)
+
+    def _compact(self, keep):
+        n = self.count; kept = int(keep.sum())
+        for array in (self.sheet, self.cell, self.fades, self.pos, self.prev_pos, self.size, self.age, self.born, self.limit, self.rise):
+            array[:kept] = array[:n][keep]
+        self.count = kept
+
     def update(self, dt):
-        elapsed_time = pygame.time.get_ticks() - self.creation_time
-        if elapsed_time >= self.duration_ms: self.kill(); return
-        self.rect.y -= self.upward_speed * dt
-        if elapsed_time > self.duration_ms / 2:
-            alpha_ratio = 1.0 - ((elapsed_time - self.duration_ms/2) / (self.duration_ms/2))
-            self.image.set_alpha(max(0, int(self.initial_alpha * alpha_ratio)))
+        n = self.count
+        if not n: return
+        fades = self.fades[:n]; age = self.age[:n]
+        age += EXPLOSION_FRAME_RATE * dt; age[fades] = game_ticks() - self.born[:n][fades]
+        keep = age < self.limit[:n]
+        if not keep.all(): self._compact(keep); n = self.count
+        if not n: return
+        fades = self.fades[:n]; age = self.age[:n]
+        self.prev_pos[:n] = self.pos[:n]
+        y = self.pos[:n, 1]; y -= self.rise[:n] * dt; numpy.trunc(y, out=y, where=fades)
+        half = self.limit[:n] / 2
+        fade = numpy.where(age > half, numpy.maximum(0, (255 * (1.0 - (age - half) / half)).astype(numpy.intp)), 255)
+        self.cell[:n] = numpy.where(fades, fade, age.astype(numpy.intp))
+
+    def batch(self, alpha=1.0):
+        # The (image, topleft) pairs for one fblits and the screen rects they cover.
+        n = self.count
+        if not n: return [], []
+        pos = self.pos[:n]
+        if alpha < 1.0: pos = pos + (pos - self.prev_pos[:n]) * (alpha - 1.0)
+        topleft = pos.tolist(); sizes = self.size[:n].tolist()
+        sheets = self.sheets; blits = []
+        for sheet, cell, xy in zip(self.sheet[:n].tolist(), self.cell[:n].tolist(), topleft):
+            image = sheets[sheet][cell]
+            if image is None:
+                image = sheets[sheet][cell] = self.sheet_sources[sheet].copy(); image.set_alpha(cell)
+            blits.append((image, xy))
+        rects = [pygame.Rect(int(x), int(y), int(w) + 2, int(h) + 2) for (x, y), (w, h) in zip(topleft, sizes)]
+        return blits, rects
+
+    def clear(self):
+        self.count = 0
+
+    def stats(self):
+        return {'budget': self.capacity, 'count': self.count, 'peak': self.peak, 'spawned': self.spawned,
+                'recycled': self.recycled, 'sheets': len(self.sheets)}
+
+effects = EffectSystem(launch_args.effect_budget)
 
 # --- Global Score & Level Variables ---
 current_score = 0
 
+# --- Session Store ---
+# Each finished run (score, time alive, meteors destroyed, level, frame-time percentiles) becomes a
+# row in a local SQLite file. record() only queues the row: a writer thread owns the connection,
+# waits up to SESSION_BATCH_SECONDS for more rows and commits them in one transaction, and reduces
+# the run's frame times to percentiles itself. It also reads the best score on the file when it
+# opens it, so best_score is known without the main thread touching the disk.
+SESSION_BATCH_SECONDS = 2.0
+SESSION_COLUMNS = ('ended_at', 'outcome', 'score', 'time_alive_s', 'meteors_destroyed', 'level', 'seed',
+                   'frames', 'frame_p50_ms', 'frame_p95_ms', 'frame_p99_ms', 'frame_max_ms')
+
+class SessionStore:
+    def __init__(self, path):
+        self.path = path; self.queue = queue.SimpleQueue(); self.best_score = None
+        self.recorded = 0; self.written = 0; self.batches = 0; self.failed = False
+        self.thread = threading.Thread(target=self._run, name="session-store", daemon=True); self.thread.start()
+
+    def record(self, session):
+        self.recorded += 1; self.queue.put(session)
+        if self.best_score is None or session['score'] > self.best_score:
+            log.info(f"New best score: {session['score']:.0f} (previous {self.best_score or 0:.0f})")
+            self.best_score = session['score']
+
+    def close(self):
+        self.queue.put(None); self.thread.join()
+
+    def _row(self, session):
+        frame_ms = numpy.asarray(session.pop('frame_ms') or [0.0])
+        p50, p95, p99 = numpy.percentile(frame_ms, (50, 95, 99)).round(3).tolist()
+        return (*(session[column] for column in SESSION_COLUMNS[:7]), len(frame_ms), p50, p95, p99, round(float(frame_ms.max()), 3))
+
+    def _run(self):
+        try:
+            connection = sqlite3.connect(self.path)
+            connection.execute(f"CREATE TABLE IF NOT EXISTS sessions (id INTEGER PRIMARY KEY, {', '.join(SESSION_COLUMNS)})")
+            best = connection.execute("SELECT MAX(score) FROM sessions").fetchone()[0]
+            if best is not None and (self.best_score is None or best > self.best_score): self.best_score = best
+        except sqlite3.Error as e:
+            log.error(f"Error opening session store {self.path}: {e}. Runs will not be recorded."); self.failed = True
+            while self.queue.get() is not None: pass
+            return
+        closing = False
+        while not closing:
+            batch = [self.queue.get()]; deadline = time.monotonic() + SESSION_BATCH_SECONDS
+            while batch[-1] is not None and (remaining := deadline - time.monotonic()) > 0:
+                try: batch.append(self.queue.get(timeout=remaining))
+                except queue.Empty: break
+            if batch[-1] is None: batch.pop(); closing = True
+            if not batch: continue
+            try:
+                with connection:
+                    connection.executemany(f"INSERT INTO sessions ({', '.join(SESSION_COLUMNS)}) VALUES ({', '.join('?' * len(SESSION_COLUMNS))})",
+                                           [self._row(session) for session in batch])
+                self.written += len(batch); self.batches += 1
+            except sqlite3.Error as e: log.error(f"Error writing {len(batch)} sessions to {self.path}: {e}")
+        connection.close()
+
+    def stats(self):
+        return {'path': self.path, 'recorded': self.recorded, 'written': self.written, 'batches': self.batches,
+                'best_score': self.best_score, 'failed': self.failed}
+
+session_db_path = launch_args.stats_db or (None if HEADLESS or launch_args.replay else SESSION_DB_PATH)
+session_store = SessionStore(session_db_path) if session_db_path else None
+session = None  # the run in progress: start time, meteors destroyed and frame times
+
+def begin_session():
+    global session
+    session = {'started_ms': sim_clock_ms, 'meteors_destroyed': 0, 'frame_ms': []}
+
+def end_session(outcome):
+    # Called once per run when it ends; later calls before the next run do nothing.
+    global session
+    if session is None: return
+    finished, session = session, None
+    if not session_store: return
+    session_store.record({'ended_at': time.strftime('%Y-%m-%d %H:%M:%S'), 'outcome': outcome, 'score': round(current_score, 3),
+                          'time_alive_s': round((sim_clock_ms - finished['started_ms']) / 1000, 3),
+                          'meteors_destroyed': finished['meteors_destroyed'], 'level': current_level, 'seed': game_seed,
+                          'frame_ms': finished['frame_ms']})
+
 # --- Collision & Game Logic ---
+def score_meteor_hit(center, score_value):
+    global current_score, shake_timer
+    current_score += score_value
+    shake_timer = SHAKE_DURATION_ON_HIT
+    if session: session['meteors_destroyed'] += 1
+    if score_popup_font:
+        effects.popup(text_cache.render(score_popup_font, f"+{score_value}", (255, 223, 0)), center)
+    effects.explosion(explosion_frames_resized, center)
+
 def check_collisions_and_level_up():
-    global game_state, current_score, shake_timer, target_score, current_level, cap_credits_video
+    global current_score, shake_timer, target_score, current_level
     
-    collisions_laser_meteor = pygame.sprite.groupcollide(laser_sprites, meteor_sprites, True, True, pygame.sprite.collide_mask)
+    collision_grid.rebuild(meteor_sprites)
+    collisions_laser_meteor = collision_grid.groupcollide(laser_sprites, True, True)
     for laser, meteors_hit in collisions_laser_meteor.items():
-        for meteor in meteors_hit:
-            current_score += meteor.score_value
-            shake_timer = SHAKE_DURATION_ON_HIT
-            if score_popup_font:
-                ScorePopup(f"+{meteor.score_value}", meteor.rect.center, score_popup_font, (255, 223, 0), 1000, 70, all_sprites)
-            if explosion_frames_resized:
-                AnimatedExplosion(explosion_frames_resized, meteor.rect.center, all_sprites)
+        for meteor in meteors_hit: score_meteor_hit(meteor.rect.center, meteor.score_value)
+    for laser, swarm_hits in meteor_swarm.collide_lasers(laser_sprites).items():
+        for center, score_value in swarm_hits: score_meteor_hit(center, score_value)
 
     if player_group.sprite and player_group.sprite.alive():
-        collided_meteor = pygame.sprite.spritecollideany(player_group.sprite, meteor_sprites, pygame.sprite.collide_mask)
+        collided_meteor = collision_grid.spritecollideany(player_group.sprite) or meteor_swarm.collide_sprite(player_group.sprite)
         if collided_meteor:
-            if explosion_frames_resized:
-                AnimatedExplosion(explosion_frames_resized, player_group.sprite.rect.center, all_sprites)
+            effects.explosion(explosion_frames_resized, player_group.sprite.rect.center)
             player_group.sprite.kill()
             if tail_group.sprite: tail_group.sprite.kill()
             
-            if pygame.mixer.music.get_busy(): 
-                pygame.mixer.music.stop()
-                print("DEBUG: Main game music stopped (player collision game over).")
-            
-            game_state = "game_over" 
+            audio.stop_music()
 
-            pygame.time.set_timer(METEOR_SPAWN_NORMAL, 0)
-            pygame.time.set_timer(METEOR_SPAWN_FAST, 0)
+            wave_scheduler.stop(); end_session('game_over')
+            scenes.switch_to("game_over")
             return
 
     if current_score >= target_score and game_state == "game": 
-        print(f"Primary Target of {target_score} reached! Score: {current_score}")
-        if pygame.mixer.music.get_busy(): 
-            pygame.mixer.music.stop()
-            print("DEBUG: Main game music stopped (primary target reached for credits).")
+        log.info(f"Primary Target of {target_score} reached! Score: {current_score}")
+        audio.stop_music(AUDIO_CROSSFADE_MS)
 
-        pygame.time.set_timer(METEOR_SPAWN_NORMAL, 0) 
-        pygame.time.set_timer(METEOR_SPAWN_FAST, 0)
+        wave_scheduler.stop(); end_session('target_reached')
         for m in meteor_sprites: m.kill() 
+        meteor_swarm.clear()
         for l in laser_sprites: l.kill()
         
         level_index = current_level - 1 
         if LEVEL_DATA[level_index].get('is_credits_trigger', False):
             credits_video_path = LEVEL_DATA[level_index].get('credits_video_path')
-            credits_music_path = LEVEL_DATA[level_index].get('credits_music_path')
-            
             if credits_video_path:
-                print(f"DEBUG: Triggering credits video: {credits_video_path}")
-                game_state = "playing_credits_video" 
-                try:
-                    if cap_credits_video: cap_credits_video.release()
-                    cap_credits_video = cv2.VideoCapture(credits_video_path)
-                    if not cap_credits_video or not cap_credits_video.isOpened():
-                        print(f"Error opening credits video: {credits_video_path}. Returning to start menu.")
-                        cap_credits_video = None
-                        game_state = "start_menu" 
-                        if start_menu_music: start_menu_music.play(loops=0)
-                    elif credits_music_path : 
-                        try:
-                            pygame.mixer.music.load(credits_music_path) 
-                            pygame.mixer.music.set_volume(0.5) 
-                            pygame.mixer.music.play(loops=-1) 
-                            print(f"DEBUG: Playing credits music: {credits_music_path}")
-                        except pygame.error as e_music:
-                            print(f"Error loading/playing credits music {credits_music_path}: {e_music}")
-                except Exception as e:
-                    print(f"Exception loading credits video: {e}")
-                    if cap_credits_video: cap_credits_video.release()
-                    cap_credits_video = None
-                    if pygame.mixer.music.get_busy(): pygame.mixer.music.stop()
-                    game_state = "start_menu"
-                    if start_menu_music: start_menu_music.play(loops=0)
+                log.debug(f"Triggering credits video: {credits_video_path}")
+                scenes.switch_to("playing_credits_video")
             else: 
-                print("DEBUG: Credits video path not defined. Returning to start menu.")
-                game_state = "start_menu"
-                if start_menu_music: start_menu_music.play(loops=0)
+                log.debug("Credits video path not defined. Returning to start menu.")
+                scenes.switch_to("start_menu")
         # else: # No more levels after primary target + credits
-        #     game_state = "start_menu"
-        #     if start_menu_music: start_menu_music.play(loops=0)
+        #     scenes.switch_to("start_menu")
             
     global score_at_last_speed_increase, current_meteor_base_speed_offset
     if game_state == "game" and current_score >= score_at_last_speed_increase + SPEED_INCREASE_INTERVAL:
         score_at_last_speed_increase += SPEED_INCREASE_INTERVAL 
         if player and player.alive(): 
             player.speed += PLAYER_SPEED_INCREMENT
-            print(f"DEBUG: Player speed increased to {player.speed} at score {current_score}")
+            log.debug(f"Player speed increased to {player.speed} at score {current_score}")
         current_meteor_base_speed_offset += METEOR_BASE_SPEED_INCREMENT
-        print(f"DEBUG: Meteor base speed offset increased to {current_meteor_base_speed_offset} at score {current_score}")
+        log.debug(f"Meteor base speed offset increased to {current_meteor_base_speed_offset} at score {current_score}")
+
+# --- Text Cache ---
+# Fonts are opened once per (file, size) and rendered text is kept in an LRU keyed on
+# (font, text, color). Cached surfaces are shared: callers may set_alpha before each blit but must
+# not draw on them. A size ladder holds one string at every point size for zoom effects, using a
+# single Font whose point_size is stepped instead of opening the TTF per size. Every font and ladder
+# is opened with the other fonts at load, so no TTF is opened during play. The ladder sizes are
+# queued then and rendered TEXT_LADDER_BUDGET_MS at a time per frame; a size asked for before its
+# turn is rendered on the spot.
+TEXT_CACHE_MAX_SURFACES = 256
+TEXT_LADDER_BUDGET_MS = 2.0
+
+class TextCache:
+    def __init__(self, max_surfaces=TEXT_CACHE_MAX_SURFACES):
+        self.fonts = {}; self.surfaces = OrderedDict(); self.ladders = {}; self.pending = deque()
+        self.max_surfaces = max_surfaces
+        self.font_opens = 0; self.hits = 0; self.misses = 0
+
+    def font(self, name, size):
+        font = self.fonts.get((name, size))
+        if font is None:
+            font = self.fonts[(name, size)] = pygame.font.Font(join(FONT_BASE_PATH, name), size); self.font_opens += 1
+        return font
+
+    def render(self, font, text, color):
+        key = (font, text, tuple(color))
+        surf = self.surfaces.get(key)
+        if surf is not None:
+            self.surfaces.move_to_end(key); self.hits += 1
+            return surf
+        self.misses += 1
+        surf = self.surfaces[key] = font.render(text, True, color)
+        if len(self.surfaces) > self.max_surfaces: self.surfaces.popitem(last=False)
+        return surf
+
+    def add_ladder(self, name, max_size, text, color):
+        key = (name, max_size, text, tuple(color))
+        if key in self.ladders: return key
+        font = pygame.font.Font(join(FONT_BASE_PATH, name), max_size); self.font_opens += 1
+        self.ladders[key] = (font, [None] * (max_size + 1))
+        self.pending.extend((key, size) for size in range(1, max_size + 1))
+        return key
+
+    def render_pending(self, budget_ms):
+        deadline = time.perf_counter() + budget_ms / 1000
+        while self.pending and time.perf_counter() < deadline:
+            key, size = self.pending.popleft()
+            font, sizes = self.ladders[key]
+            if sizes[size] is None: font.point_size = size; sizes[size] = font.render(key[2], True, key[3])
+
+    def ladder(self, name, max_size, text, color, size):
+        font, sizes = self.ladders[self.add_ladder(name, max_size, text, color)]
+        size = max(1, min(size, max_size))
+        surf = sizes[size]
+        if surf is not None: self.hits += 1; return surf
+        self.misses += 1
+        font.point_size = size; surf = sizes[size] = font.render(text, True, color)
+        return surf
+
+    def stats(self):
+        return {'font_opens': self.font_opens, 'hits': self.hits, 'misses': self.misses,
+                'surfaces': len(self.surfaces), 'ladders': len(self.ladders), 'ladder_sizes_pending': len(self.pending)}
+
+text_cache = TextCache()
 
 # --- UI Display Functions ---
-score_font = None; score_popup_font = None; placeholder_font = None
+score_font = None; score_popup_font = None; placeholder_font = None; profiler_overlay_font = None
 primary_target_font_main = None; primary_target_font_score_val = None
 
-def display_score(surface_to_draw_on):
-    if score_font and (game_state == "game" or game_state == "game_intro_animation" or game_state == "display_primary_target_text"):
-        text_surface = score_font.render(f"Score: {int(current_score)}", True, (240, 240, 240))
-        surface_to_draw_on.blit(text_surface, text_surface.get_frect(midtop=(display_width / 2, 10)))
+class ScoreHud(pygame.sprite.DirtySprite):
+    # Score text on the HUD layer; re-rendered (and marked dirty) only when the shown value changes.
+    def __init__(self, groups):
+        self._layer = LAYER_HUD
+        super().__init__(groups); self.shown_score = None
+        self.image = pygame.Surface((1, 1), pygame.SRCALPHA); self.rect = self.image.get_frect(midtop=(display_width / 2, 10))
+
+    def refresh(self):
+        self.visible = int(bool(score_font) and game_state == "game")
+        if not self.visible or int(current_score) == self.shown_score: return
+        self.shown_score = int(current_score)
+        self.image = score_font.render(f"Score: {self.shown_score}", True, (240, 240, 240))
+        self.rect = self.image.get_frect(midtop=(display_width / 2, 10)); self.dirty = 1
+
+score_hud = None
 
 def display_primary_target_text_effect(surface_to_draw_on): 
     global primary_target_text_effect_start_time, target_score, current_pygame_time_sec
@@ -378,7 +1732,7 @@ def display_primary_target_text_effect(surface_to_draw_on):
         text1_str = "Primary Target"
         text2_str = str(target_score) 
 
-        text1_surf = primary_target_font_main.render(text1_str, True, (255, 255, 255)) 
+        text1_surf = text_cache.render(primary_target_font_main, text1_str, (255, 255, 255))
         text1_surf.set_alpha(alpha)
         
         scale_factor = 0.1 + 0.9 * progress 
@@ -388,29 +1742,29 @@ def display_primary_target_text_effect(surface_to_draw_on):
 
         if scale_factor > 0.01 : 
             try:
-                temp_score_font_size = int(primary_target_font_score_val.get_height() * scale_factor)
+                max_font_size = primary_target_font_score_val.get_height()
+                temp_score_font_size = int(max_font_size * scale_factor)
                 if temp_score_font_size < 1: temp_score_font_size = 1
                 
-                scaled_font = pygame.font.Font(join(FONT_BASE_PATH, 'Poppins-ExtraLight.ttf'), temp_score_font_size)
-                text2_surf_scaled = scaled_font.render(text2_str, True, text2_color)
+                text2_surf_scaled = text_cache.ladder('Poppins-ExtraLight.ttf', max_font_size, text2_str, text2_color, temp_score_font_size)
                 text2_surf_scaled.set_alpha(alpha)
 
-                if progress < 0.8 : 
+                if progress < 0.8 and quality.tier['text_blur']: 
                     num_blurs = 3
                     blur_offset_range = 15 * (1.0 - progress) 
                     for _ in range(num_blurs):
                         blur_alpha = int(alpha * 0.15) 
                         text2_surf_scaled.set_alpha(blur_alpha)
-                        offset_x = rand_uniform(-blur_offset_range, blur_offset_range)
-                        offset_y = rand_uniform(-blur_offset_range, blur_offset_range)
+                        offset_x = fx_rng.uniform(-blur_offset_range, blur_offset_range)
+                        offset_y = fx_rng.uniform(-blur_offset_range, blur_offset_range)
                         surface_to_draw_on.blit(text2_surf_scaled, text2_surf_scaled.get_rect(center=(display_width / 2 + offset_x, display_height / 2 + 40 + offset_y)))
                 
                 text2_surf_scaled.set_alpha(alpha) 
                 surface_to_draw_on.blit(text2_surf_scaled, text2_surf_scaled.get_rect(center=(display_width / 2, display_height / 2 + 40)))
             except pygame.error as font_error: 
-                print(f"Font scaling error for primary target: {font_error}")
+                log.error(f"Font scaling error for primary target: {font_error}")
                 unscaled_font_to_use = score_font if score_font else placeholder_font 
-                text2_surf_unscaled = unscaled_font_to_use.render(text2_str, True, text2_color)
+                text2_surf_unscaled = text_cache.render(unscaled_font_to_use, text2_str, text2_color)
                 text2_surf_unscaled.set_alpha(alpha)
                 surface_to_draw_on.blit(text2_surf_unscaled, text2_surf_unscaled.get_rect(center=(display_width/2, display_height/2 + 40)))
         
@@ -418,54 +1772,236 @@ def display_primary_target_text_effect(surface_to_draw_on):
 
 # --- Game State & Video Assets ---
 game_state = "start_menu"
-start_menu_image_surf = pygame.image.load(join(IMAGE_BASE_PATH, 'StartScreen.png')).convert()
-start_menu_image_surf = pygame.transform.scale(start_menu_image_surf, (display_width, display_height))
+START_SCREEN_IMAGE_PATH = join(IMAGE_BASE_PATH, 'StartScreen.png')
+start_menu_image_surf = asset_cache.image(START_SCREEN_IMAGE_PATH, (display_width, display_height), alpha=False, smooth=False)
 start_menu_rect = start_menu_image_surf.get_rect(center=(display_width // 2, display_height // 2))
-start_menu_music = None 
-try:
-    start_menu_music = pygame.mixer.Sound(START_MENU_MUSIC_PATH)
-except pygame.error as e: print(f"Error loading start menu music: {e}")
-
-story_build_sound = None
-try:
-    story_build_sound = pygame.mixer.Sound(STORYBUILD_AUDIO_PATH)
-    story_build_sound.set_volume(0.5) 
-except pygame.error as e: print(f"Error loading StoryBuild sound ({STORYBUILD_AUDIO_PATH}): {e}")
-
-
-cap_start = None
-try:
-    cap_start_temp = cv2.VideoCapture(VIDEO_PATH_START)
-    if cap_start_temp and cap_start_temp.isOpened(): cap_start = cap_start_temp
-    else:
-        if cap_start_temp: cap_start_temp.release()
-        print(f"Warning: Could not open start video: {VIDEO_PATH_START}"); cap_start = None
-except Exception as e: print(f"Exception initializing start video: {e}"); cap_start = None
-
-cap_intro_clip_1 = None; latest_intro_clip_1_pygame_surface = None
-cap_intro_clip_2 = None; latest_intro_clip_2_pygame_surface = None
-cap_game_over = None
 try:
-    cap_game_over_temp = cv2.VideoCapture(VIDEO_PATH_GAME_OVER)
-    if cap_game_over_temp and cap_game_over_temp.isOpened(): cap_game_over = cap_game_over_temp
-    else:
-        if cap_game_over_temp: cap_game_over_temp.release()
-        print(f"Warning: Could not open game over video: {VIDEO_PATH_GAME_OVER}"); cap_game_over = None
-except Exception as e: print(f"Exception initializing game over video: {e}"); cap_game_over = None
+    audio.add_sound('start_menu', load_sound(START_MENU_MUSIC_PATH, 0.3), channel='menu')
+except pygame.error as e: log.error(f"Error loading start menu music: {e}")
+
+asset_loader.submit('story_build_sound', load_sound, STORYBUILD_AUDIO_PATH, 0.5)
+audio.add_sound('story_build', job='story_build_sound', channel='story')
+
+
+# --- Video Frame Store ---
+# Optional (--video-cache) on-disk copy of each video, already resized to the display and kept in
+# OpenCV's BGR layout. It is written while the first full pass of a video is decoded and used by
+# later runs as a memmap instead of cv2.VideoCapture; the source's mtime and size mark it stale.
+# The store records the frames actually decoded up to the end of the stream. The container's frame
+# count is only an estimate, so it is kept when it lands within VIDEO_CACHE_FRAME_SLACK of it; a pass
+# cut short by a decode error falls well below and is dropped. .tmp files left behind by a killed
+# process are removed on open.
+VIDEO_FRAME_CACHE_ENABLED = launch_args.video_cache
+VIDEO_CACHE_DIR = join('cache', 'video')
+VIDEO_CACHE_VERSION = 1
+VIDEO_CACHE_FRAME_SLACK = 0.02  # fraction of the estimated frame count a finished pass may fall short by
+
+class VideoFrameStore:
+    writing_paths = set()  # .tmp files a store in this process is still writing
+
+    def __init__(self, source_path, size):
+        self.source_path = source_path; self.size = size
+        stem = os.path.splitext(os.path.basename(source_path))[0]
+        name = f"{stem}_{size[0]}x{size[1]}"
+        self.data_path = join(VIDEO_CACHE_DIR, name + '.bgr'); self.index_path = join(VIDEO_CACHE_DIR, name + '.json')
+        self.writing = None; self.count = 0; self.expected_frames = 0
+        self._remove_stale_temp_files(stem)
+
+    def _remove_stale_temp_files(self, stem):
+        try: names = os.listdir(VIDEO_CACHE_DIR)
+        except OSError: return
+        for name in names:
+            path = join(VIDEO_CACHE_DIR, name)
+            if name.startswith(stem + '_') and name.endswith('.tmp') and path not in VideoFrameStore.writing_paths:
+                try: os.remove(path); log.debug(f"Removed stale video frame store file {path}")
+                except OSError: pass
+
+    def _source_signature(self):
+        stat = os.stat(self.source_path)
+        return {'mtime': stat.st_mtime, 'size': stat.st_size}
+
+    def load(self):
+        try:
+            with open(self.index_path) as f: index = json.load(f)
+            if (index.get('version') != VIDEO_CACHE_VERSION or index.get('source') != self._source_signature()
+                    or tuple(index.get('frame_size', ())) != tuple(self.size)):
+                log.debug(f"Video frame store for {self.source_path} is stale, decoding source.")
+                return None
+            width, height = self.size
+            return numpy.memmap(self.data_path, numpy.uint8, 'r', shape=(index['frames'], height, width, 3)) if index['frames'] else None
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def begin(self, estimated_frames):
+        if estimated_frames <= 0: return
+        try:
+            os.makedirs(VIDEO_CACHE_DIR, exist_ok=True)
+            width, height = self.size
+            self.writing = numpy.memmap(self.data_path + '.tmp', numpy.uint8, 'w+', shape=(int(estimated_frames * (1 + VIDEO_CACHE_FRAME_SLACK)) + 16, height, width, 3))
+            VideoFrameStore.writing_paths.add(self.data_path + '.tmp')
+            self.count = 0; self.expected_frames = estimated_frames
+        except OSError as e:
+            log.error(f"Error creating video frame store for {self.source_path}: {e}"); self.writing = None
+
+    def append(self, frame):
+        if self.writing is None: return
+        if self.count >= len(self.writing): self.abort(); return
+        self.writing[self.count] = frame; self.count += 1
+
+    def finish(self):
+        if self.writing is None: return
+        if self.count == 0 or self.count < self.expected_frames - max(2, self.expected_frames * VIDEO_CACHE_FRAME_SLACK):
+            log.warning(f"Video frame store for {self.source_path} not kept: decoded {self.count} of about {self.expected_frames} frames.")
+            self.abort(); return
+        try:
+            self.writing.flush(); frame_bytes = self.writing[0].nbytes; self.writing = None
+            VideoFrameStore.writing_paths.discard(self.data_path + '.tmp')
+            os.truncate(self.data_path + '.tmp', self.count * frame_bytes)
+            os.replace(self.data_path + '.tmp', self.data_path)
+            index = {'version': VIDEO_CACHE_VERSION, 'source': self._source_signature(), 'frame_size': list(self.size), 'frames': self.count}
+            with open(self.index_path + '.tmp', 'w') as f: json.dump(index, f)
+            os.replace(self.index_path + '.tmp', self.index_path)
+            log.debug(f"Video frame store written for {self.source_path} ({self.count} frames).")
+        except OSError as e:
+            log.error(f"Error writing video frame store for {self.source_path}: {e}"); self.abort()
+
+    def abort(self):
+        if self.writing is None: return
+        self.writing = None; VideoFrameStore.writing_paths.discard(self.data_path + '.tmp')
+        try: os.remove(self.data_path + '.tmp')
+        except OSError: pass
+
+# --- Threaded Video Playback ---
+# Each VideoPlayer decodes and resizes frames on a worker thread into a fixed set of preallocated
+# slots. A slot is a BGR NumPy buffer plus a Surface created once with image.frombuffer over that
+# same memory, so OpenCV writes land directly in the pixels we blit: no cvtColor, no make_surface
+# and no per-frame allocation. The render loop takes one ready slot per call and never waits on
+# decode; if the worker falls behind, the last frame is shown again and counted as an underrun.
+# With a fresh VideoFrameStore there is no decoder at all: each frame is a memmap slice wrapped by
+# frombuffer and blitted.
+VIDEO_PREFETCH_FRAMES = 8
+
+class VideoPlayer:
+    def __init__(self, path, loop=False, size=None, prefetch=VIDEO_PREFETCH_FRAMES):
+        self.path = path; self.loop = loop; self.size = size or (display_width, display_height)
+        self.cond = threading.Condition()
+        self.ended = False; self.stopping = False; self.rewind_requested = False
+        self.frames_decoded = 0; self.frames_shown = 0; self.underruns = 0
+        self.cap = None; self.thread = None; self.current = None
+        self.store = VideoFrameStore(path, self.size) if VIDEO_FRAME_CACHE_ENABLED else None
+        self.stored_frames = self.store.load() if self.store else None
+        self.position = 0
+        if self.stored_frames is not None: return
+        width, height = self.size
+        self.slots = []
+        for _ in range(prefetch + 1):
+            pixels = numpy.zeros((height, width, 3), numpy.uint8)
+            self.slots.append((pixels, pygame.image.frombuffer(pixels, self.size, 'BGR')))
+        self.free_slots = list(self.slots); self.ready = deque()
+        self.decode_buffer = None
+        self.cap = cv2.VideoCapture(path)
+        if self.cap.isOpened():
+            self.thread = threading.Thread(target=self._decode_loop, name=f"video:{path}", daemon=True)
+            self.thread.start()
+
+    def isOpened(self):
+        return self.stored_frames is not None or (self.cap is not None and self.cap.isOpened())
+
+    def _decode_loop(self):
+        if self.store: self.store.begin(int(self.cap.get(cv2.CAP_PROP_FRAME_COUNT)))
+        while True:
+            with self.cond:
+                while not (self.stopping or self.rewind_requested) and (self.ended or not self.free_slots):
+                    self.cond.wait()
+                if self.stopping: break
+                rewinding = self.rewind_requested
+                if rewinding:
+                    self.cap.set(cv2.CAP_PROP_POS_FRAMES, 0); self.rewind_requested = False
+                slot = self.free_slots.pop()
+            if rewinding and self.store: self.store.abort()
+            ret, frame = self.cap.read(self.decode_buffer)
+            if not ret and self.loop:
+                if self.store: self.store.finish()
+                self.cap.set(cv2.CAP_PROP_POS_FRAMES, 0); ret, frame = self.cap.read(self.decode_buffer)
+            if ret:
+                self.decode_buffer = frame
+                try:
+                    cv2.resize(frame, self.size, dst=slot[0])
+                    if self.store: self.store.append(slot[0])
+                except Exception as e:
+                    log.error(f"Frame error in video worker ({self.path}): {e}"); ret = False
+                    if self.store: self.store.abort()
+            elif self.store: self.store.finish()
+            with self.cond:
+                if self.stopping or self.rewind_requested: self.free_slots.append(slot); continue
+                if ret: self.ready.append(slot); self.frames_decoded += 1
+                else: self.free_slots.append(slot); self.ended = True
+        if self.store: self.store.abort()
+
+    def _next_stored_frame(self):
+        if self.position >= len(self.stored_frames):
+            if not self.loop: return None, True
+            self.position = 0
+        self.current = pygame.image.frombuffer(self.stored_frames[self.position], self.size, 'BGR')
+        self.position += 1; self.frames_shown += 1
+        return self.current, False
+
+    def next_frame(self):
+        if self.stored_frames is not None: return self._next_stored_frame()
+        with self.cond:
+            if self.ready:
+                if self.current: self.free_slots.append(self.current)
+                self.current = self.ready.popleft(); self.frames_shown += 1
+                self.cond.notify_all()
+                return self.current[1], False
+            if self.ended: return None, True
+            self.underruns += 1
+            return (self.current[1] if self.current else None), False
+
+    def rewind(self):
+        if self.stored_frames is not None: self.position = 0; return
+        with self.cond:
+            self.free_slots.extend(self.ready); self.ready.clear()
+            if self.current: self.free_slots.append(self.current); self.current = None
+            self.ended = False; self.rewind_requested = True
+            self.cond.notify_all()
+
+    def release(self):
+        with self.cond:
+            self.stopping = True
+            self.cond.notify_all()
+        if self.thread: self.thread.join(); self.thread = None
+        if self.cap: self.cap.release(); self.cap = None
+        self.stored_frames = None
+
+    def stats(self):
+        return {'decoded': self.frames_decoded, 'shown': self.frames_shown, 'underruns': self.underruns,
+                'stored': self.stored_frames is not None}
+
+def open_video(path, loop=False):
+    player = VideoPlayer(path, loop=loop, size=quality.video_size())
+    if player.isOpened(): return player
+    player.release(); log.warning(f"Could not open video: {path}")
+    return None
+
+def take_video(path, loop=False):
+    # Hands over the player opened in the background for this path, or opens one now.
+    if asset_loader.has(f"video:{path}"):
+        try: return asset_loader.take(f"video:{path}")
+        except Exception as e: log.error(f"Exception initializing video {path}: {e}"); return None
+    return VideoPlayer(path, loop=loop, size=quality.video_size())
 
 # --- Video Frame Drawing Utility ---
-def draw_video_frame_or_fallback(cap_obj, fallback_surf=None, fallback_rect=None, store_surface_global_var_name=None, loop=False):
+def draw_video_frame_or_fallback(video, fallback_surf=None, fallback_rect=None, store_surface_global_var_name=None):
     frame_drawn, video_ended = False, True; current_surf = None
-    if cap_obj and cap_obj.isOpened():
-        ret, frame = cap_obj.read()
-        if not ret and loop: cap_obj.set(cv2.CAP_PROP_POS_FRAMES, 0); ret,frame = cap_obj.read()
-        if ret:
-            video_ended = False
+    if video and video.isOpened():
+        outer_phase = frame_profiler.begin('video')
+        current_surf, video_ended = video.next_frame()
+        frame_profiler.begin(outer_phase)
+        if current_surf is not None:
             try:
-                frame = cv2.cvtColor(frame,cv2.COLOR_BGR2RGB)
-                current_surf = pygame.surfarray.make_surface(cv2.resize(frame,(display_width,display_height)).swapaxes(0,1))
-                screen.blit(current_surf,(0,0)); frame_drawn = True
-            except Exception as e: print(f"Frame error in draw_video: {e}"); current_surf = None
+                render_backend.video_frame(current_surf); frame_drawn = True
+            except Exception as e: log.error(f"Frame error in draw_video: {e}"); current_surf = None
     if not frame_drawn:
         if fallback_surf and fallback_rect: screen.blit(fallback_surf,fallback_rect)
         else: screen.fill((5,5,5))
@@ -474,83 +2010,289 @@ def draw_video_frame_or_fallback(cap_obj, fallback_surf=None, fallback_rect=None
 
 # --- Load Assets ---
 try:
-    score_font = pygame.font.Font(join(FONT_BASE_PATH, 'Poppins-ExtraLight.ttf'), 50)
-    primary_target_font_main = pygame.font.Font(join(FONT_BASE_PATH, 'Poppins-ExtraLight.ttf'), 70) 
-    primary_target_font_score_val = pygame.font.Font(join(FONT_BASE_PATH, 'Poppins-ExtraLight.ttf'), 90) 
-    score_popup_font = pygame.font.Font(join(FONT_BASE_PATH, 'Poppins-Thin.ttf'), 28)
-    placeholder_font = pygame.font.Font(join(FONT_BASE_PATH, 'Poppins-Regular.ttf'), 40) 
+    score_font = text_cache.font('Poppins-ExtraLight.ttf', 50)
+    primary_target_font_main = text_cache.font('Poppins-ExtraLight.ttf', 70)
+    primary_target_font_score_val = text_cache.font('Poppins-ExtraLight.ttf', 90)
+    score_popup_font = text_cache.font('Poppins-Thin.ttf', 28)
+    placeholder_font = text_cache.font('Poppins-Regular.ttf', 40)
+    profiler_overlay_font = text_cache.font('Poppins-Regular.ttf', 14)
     # win_font removed from here
-except pygame.error as e: print(f"Font loading error: {e}"); pygame.quit(); sys.exit()
+    for level in LEVEL_DATA:
+        text_cache.add_ladder('Poppins-ExtraLight.ttf', primary_target_font_score_val.get_height(), str(level['target']), (255, 255, 255))
+except (pygame.error, FileNotFoundError) as e: log.error(f"Font loading error: {e}"); pygame.quit(); sys.exit()
 
-try: background = pygame.image.load(join(IMAGE_BASE_PATH, 'Background.png')).convert()
-except pygame.error as e: print(f"Background load error: {e}"); background = None
-
-music_loaded_for_main_game = False 
-try:
-    pygame.mixer.music.load(GAME_MUSIC_PATH)
-    pygame.mixer.music.set_volume(0.2) 
-    music_loaded_for_main_game = True
-    print(f"DEBUG: Game music {GAME_MUSIC_PATH} loaded into mixer.music channel.")
-except pygame.error as e:
-    print(f"Error loading game music ({GAME_MUSIC_PATH}) with pygame.mixer.music: {e}")
-    music_loaded_for_main_game = False
-
-laser_sound = None; credits_music = None
-try: 
-    laser_sound=pygame.mixer.Sound(LASER_SOUND_PATH)
-    laser_sound.set_volume(0.15)
-except pygame.error as e: print(f"Error loading laser sound: {e}")
-try:
-    credits_music = pygame.mixer.Sound(CREDITS_MUSIC_PATH) 
-    credits_music.set_volume(0.5) 
-except pygame.error as e: print(f"Error loading {CREDITS_MUSIC_PATH}: {e}")
+background = None
+BACKGROUND_IMAGE_PATH = join(IMAGE_BASE_PATH, 'Background.png')
+EXPLOSION_FRAME_PATHS = [join(IMAGE_BASE_PATH,'Explosion_frames',f'{i}.png') for i in range(8)]
+METEOR_IMAGE_PATHS = [join(IMAGE_BASE_PATH,f'Meteor_{i}.png') for i in range(1,4)]
+TRAIL_FRAME_PATHS = [join(IMAGE_BASE_PATH,'Spaceship_trail',f'{i}.png') for i in range(1,4)]
+EXPLOSION_FRAME_SIZE = (90, 90); TRAIL_FRAME_SIZE = (30, 50)
 
+audio.load_music(GAME_MUSIC_PATH, 0.2)
 
-if start_menu_music: start_menu_music.set_volume(0.3)
+asset_loader.submit('laser_sound', load_sound, LASER_SOUND_PATH, 0.15)
+asset_loader.submit('credits_music', load_sound, CREDITS_MUSIC_PATH, 0.5)
+audio.add_sound('laser', job='laser_sound')
+audio.add_sound('credits', job='credits_music', channel='credits')
 
 explosion_frames_resized=[]; meteor_surfaces=[]; back_stream_frames=[]
-try:
-    for i in range(8): explosion_frames_resized.append(pygame.transform.smoothscale(pygame.image.load(join(IMAGE_BASE_PATH,'Explosion_frames',f'{i}.png')).convert_alpha(),(90,90)))
-    for i in range(1,4): meteor_surfaces.append(pygame.image.load(join(IMAGE_BASE_PATH,f'Meteor_{i}.png')).convert_alpha())
-    for i in range(1,4): back_stream_frames.append(pygame.transform.smoothscale(pygame.image.load(join(IMAGE_BASE_PATH,'Spaceship_trail',f'{i}.png')).convert_alpha(),(30,50)))
-except pygame.error as e: print(f"Error loading game sprites: {e}")
-planet_sprites_info=[(join(IMAGE_BASE_PATH,f'Planet_{i}.png'),pos,spd) for i,pos,spd in [(1,(100,-400),40),(2,(display_width-300,-900),35),(3,(display_width/2,-1500),50)]]
-try: stars_surface = pygame.image.load(join(IMAGE_BASE_PATH,'Stars.png')).convert_alpha()
-except pygame.error as e: print(f"Error loading stars: {e}"); stars_surface = None
 
-# --- Custom Events ---
-METEOR_SPAWN_NORMAL=pygame.USEREVENT+1; METEOR_SPAWN_FAST=pygame.USEREVENT+2
+# --- Parallax Background ---
+# Each scroll layer is built once: a tiling layer (stars) is pre-composited into one screen-wide
+# strip at least a screen tall, a sprite layer (planet) is its own image. Per frame a layer costs
+# at most two blits at a wrapped offset, however many tiles the resolution needs.
+PARALLAX_LAYERS = [
+    {'image': 'Stars.png', 'speed': 20, 'tile': True},
+    {'image': 'Planet_1.png', 'pos': (100, -400), 'speed': 40},
+    {'image': 'Planet_2.png', 'pos': (display_width - 300, -900), 'speed': 35},
+    {'image': 'Planet_3.png', 'pos': (display_width / 2, -1500), 'speed': 50},
+]
+
+class ParallaxBackground:
+    def __init__(self, base, layer_specs):
+        if base is None:
+            base = pygame.Surface((display_width, display_height)); base.fill((0,0,10))
+        self.base = base; self.layers = []; self.elapsed = 0.0; self.prev_elapsed = 0.0; self.still_surface = None
+        for spec in layer_specs:
+            path = join(IMAGE_BASE_PATH, spec['image'])
+            try: surf = asset_cache.image(path)
+            except pygame.error as e: log.error(f"Parallax layer load error {path}: {e}"); continue
+            if surf.get_width() <= 0 or surf.get_height() <= 0: continue
+            if spec.get('tile'): surf = self._tiled_strip(surf)
+            self.layers.append({'surface': surf, 'speed': spec['speed'], 'tile': spec.get('tile', False), 'pos': spec.get('pos', (0, 0))})
+        self.scrolling = any(layer['speed'] for layer in self.layers)
+
+    def _tiled_strip(self, tile):
+        tile_w, tile_h = tile.get_size()
+        strip = pygame.Surface((display_width, tile_h * max(1, -(-display_height // tile_h))), pygame.SRCALPHA)
+        for x in range(0, display_width, tile_w):
+            for y in range(0, strip.get_height(), tile_h): strip.blit(tile, (x, y))
+        return strip
+
+    def reset(self):
+        self.elapsed = 0.0; self.prev_elapsed = 0.0; self.still_surface = None
+
+    def still(self):
+        # The 'still' quality tier holds the layers where they are, composed once onto the base,
+        # so the gameplay renderer can fall back to repainting dirty rects only.
+        if self.still_surface is None:
+            self.still_surface = self.base.copy(); self.draw(self.still_surface)
+        return self.still_surface
+
+    def animated(self):
+        return self.scrolling and quality.tier['parallax'] != 'still'
+
+    def update(self, dt):
+        self.prev_elapsed = self.elapsed; self.elapsed += dt
+
+    def draw(self, surface, alpha=1.0):
+        surface.blit(self.base, (0, 0))
+        elapsed = self.prev_elapsed + (self.elapsed - self.prev_elapsed) * alpha
+        stars_only = quality.tier['parallax'] == 'stars'
+        for layer in self.layers:
+            if stars_only and not layer['tile']: continue
+            surf = layer['surface']; travel = layer['speed'] * elapsed
+            if layer['tile']:
+                strip_h = surf.get_height(); y = travel % strip_h
+                surface.blit(surf, (0, y))
+                if y > 0: surface.blit(surf, (0, y - strip_h))
+            else:
+                x, start_y = layer['pos']; planet_h = surf.get_height(); y = start_y + travel
+                if y >= display_height: y = -planet_h + (y - display_height) % (display_height + planet_h)
+                surface.blit(surf, (x, y))
+
+parallax_background = None
+
+for prefetch_path in ([BACKGROUND_IMAGE_PATH, PLAYER_IMAGE_PATH, LASER_IMAGE_PATH] + METEOR_IMAGE_PATHS + EXPLOSION_FRAME_PATHS
+                      + TRAIL_FRAME_PATHS + [join(IMAGE_BASE_PATH, spec['image']) for spec in PARALLAX_LAYERS]):
+    asset_cache.prefetch(prefetch_path)
+
+gameplay_assets_ready = False
+
+def load_gameplay_assets():
+    # First setup_game collects everything gameplay needs; it only waits on jobs still in flight.
+    global gameplay_assets_ready, background, explosion_frames_resized, meteor_surfaces, back_stream_frames, parallax_background
+    if gameplay_assets_ready: return
+    try: background = asset_cache.image(BACKGROUND_IMAGE_PATH, alpha=False)
+    except pygame.error as e: log.error(f"Background load error: {e}"); background = None
+    audio.sound('laser')
+    try:
+        explosion_frames_resized = asset_cache.frames(EXPLOSION_FRAME_PATHS, EXPLOSION_FRAME_SIZE)
+        meteor_surfaces = asset_cache.frames(METEOR_IMAGE_PATHS)
+        back_stream_frames = asset_cache.frames(TRAIL_FRAME_PATHS, TRAIL_FRAME_SIZE)
+    except pygame.error as e: log.error(f"Error loading game sprites: {e}")
+    # A packed mask is read without its image, so both are warmed here rather than on the first shot.
+    for warm_path, warm_size in [(PLAYER_IMAGE_PATH, None), (LASER_IMAGE_PATH, LASER_IMAGE_SIZE)]:
+        try: asset_cache.image(warm_path, warm_size); asset_cache.mask(warm_path, warm_size)
+        except pygame.error as e: log.error(f"Error preloading {warm_path}: {e}")
+    parallax_background = ParallaxBackground(background, PARALLAX_LAYERS)
+    gameplay_assets_ready = True
+
+# Every asset_cache key the game asks for, so the pack covers all of them; masks are baked for the
+# sprites that collide with their image mask.
+ASSET_BAKE_SPECS = ([(START_SCREEN_IMAGE_PATH, (display_width, display_height), False, False), (BACKGROUND_IMAGE_PATH, None, False, True),
+                     (PLAYER_IMAGE_PATH, None, True, True), (LASER_IMAGE_PATH, LASER_IMAGE_SIZE, True, True)]
+                    + [(path, EXPLOSION_FRAME_SIZE, True, True) for path in EXPLOSION_FRAME_PATHS]
+                    + [(path, None, True, True) for path in METEOR_IMAGE_PATHS]
+                    + [(path, TRAIL_FRAME_SIZE, True, True) for path in TRAIL_FRAME_PATHS]
+                    + [(join(IMAGE_BASE_PATH, spec['image']), None, True, True) for spec in PARALLAX_LAYERS])
+ASSET_BAKE_MASKS = {(PLAYER_IMAGE_PATH, None, True, True), (LASER_IMAGE_PATH, LASER_IMAGE_SIZE, True, True)}
+
+def bake_asset_pack(path):
+    started = time.perf_counter(); entries = []; blobs = []; offset = 0
+    def add_blob(data):
+        nonlocal offset
+        span = [offset, len(data)]; padding = -len(data) % ASSET_PACK_ALIGN
+        blobs.append(bytes(data) + bytes(padding)); offset += len(data) + padding
+        return span
+    for key in ASSET_BAKE_SPECS:
+        try: surf = asset_cache.image(*key)
+        except pygame.error as e: log.error(f"Leaving {key[0]} out of the asset pack: {e}"); continue
+        if surf.get_bitsize() != 32: log.warning(f"Leaving {key[0]} out of the asset pack: {surf.get_bitsize()}-bit pixels"); continue
+        entry = {'path': key[0], 'size': list(key[1]) if key[1] else None, 'alpha': key[2], 'smooth': key[3],
+                 'pixel_size': list(surf.get_size()), 'pitch': surf.get_pitch(), 'masks': list(surf.get_masks()),
+                 'srcalpha': bool(surf.get_flags() & pygame.SRCALPHA), 'pixels': add_blob(surf.get_buffer().raw), 'mask': None}
+        if key in ASSET_BAKE_MASKS: entry['mask'] = add_blob(memoryview(asset_cache.mask(*key)).cast('B'))
+        entries.append(entry)
+    index = json.dumps({'source_hash': AssetPack.source_hash(AssetPack.key(entry) for entry in entries),
+                        'display_format': AssetPack.display_format(), 'entries': entries}).encode()
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path + '.tmp', 'wb') as f:
+            f.write(ASSET_PACK_HEADER.pack(ASSET_PACK_MAGIC, ASSET_PACK_VERSION, len(index)) + index)
+            f.write(bytes(_pack_data_start(len(index)) - f.tell()))
+            for blob in blobs: f.write(blob)
+        os.replace(path + '.tmp', path)
+    except OSError as e:
+        log.error(f"Error writing asset pack {path}: {e}"); return False
+    log.info(f"Baked {len(entries)} images ({sum(1 for entry in entries if entry['mask'])} with masks) into {path}: "
+             f"{(_pack_data_start(len(index)) + offset) / (1024 * 1024):.1f} MB in {(time.perf_counter() - started) * 1000:.0f} ms")
+    return True
+
+# --- Wave Scheduler ---
+# Compiles the level's waves into one spawn schedule sorted by simulation time before the level
+# starts, drawing every random choice (meteor, width, position, heading, speed, spin) up front. In a
+# step, spawning is a walk of the cursor over the entries that came due. The schedule is compiled
+# WAVE_HORIZON_MS ahead and topped up halfway through; only the score-driven speed offset is added
+# at spawn time. The rotation cache frames for each meteor and width a level uses are queued when
+# the game is set up and rendered WAVE_PREWARM_BUDGET_MS at a time per frame, mostly during the
+# intro animation; a meteor spawned before its sheet is done fills the missing frames itself.
+WAVE_HORIZON_MS = 60000
+WAVE_PREWARM_BUDGET_MS = 3.0
+
+class WaveScheduler:
+    def __init__(self):
+        self.entries = []; self.cursor = 0; self.waves = []; self.compiled_until = 0.0; self.level_start = 0.0
+        self.compiled = 0; self.spawned = 0; self.most_per_step = 0
+        self.prewarm_queue = deque(); self.prewarm_ms = 0.0; self.prewarm_frames = 0
+
+    @property
+    def active(self):
+        return bool(self.waves)
+
+    def start(self, level, spawn_rate_multiplier, speed_multiplier):
+        self.stop()
+        if not meteor_surfaces: return
+        self.level_start = sim_clock_ms; self.compiled_until = sim_clock_ms
+        for spec in level.get('waves', ()):
+            wave = {**WAVE_DEFAULTS, **spec}
+            wave['min_interval_ms'] = (wave['min_interval_ms'] or wave['interval_ms']) * spawn_rate_multiplier
+            wave['interval_ms'] *= spawn_rate_multiplier
+            wave['speed_multiplier'] = speed_multiplier * wave['speed_scale']
+            wave['next_ms'] = self.level_start + (wave['start_ms'] if wave['start_ms'] is not None else wave['interval_ms'])
+            self.waves.append(wave)
+        self._compile(self.level_start + WAVE_HORIZON_MS)
+
+    def queue_prewarm(self, level):
+        self.prewarm_queue.clear()
+        widths = sorted({width for spec in level.get('waves', ()) for width in METEOR_SIZE_CLASSES[spec['size_class']]})
+        for surf in meteor_surfaces:
+            if surf.get_width() <= 0: continue
+            for width in widths:
+                scale = width / surf.get_width()
+                self.prewarm_queue.extend((surf, scale, bucket) for bucket in rotation_cache.missing(surf, scale))
+
+    def prewarm(self, budget_ms):
+        started = time.perf_counter(); deadline = started + budget_ms / 1000
+        while self.prewarm_queue and time.perf_counter() < deadline:
+            rotation_cache.frame(*self.prewarm_queue.popleft()); self.prewarm_frames += 1
+        self.prewarm_ms += (time.perf_counter() - started) * 1000
+
+    def stop(self):
+        self.waves = []; self.entries = []; self.cursor = 0
+
+    def _interval(self, wave, at_ms):
+        if not wave['ramp_ms']: return wave['interval_ms']
+        progress = min((at_ms - self.level_start) / wave['ramp_ms'], 1.0)
+        return wave['interval_ms'] + (wave['min_interval_ms'] - wave['interval_ms']) * progress
+
+    def _compile(self, until_ms):
+        # Entries: (time_ms, surface index, width, x, y, heading, speed roll, speed multiplier, spin, score)
+        chunk = []
+        for wave in self.waves:
+            widths = METEOR_SIZE_CLASSES[wave['size_class']]
+            end_ms = self.level_start + wave['end_ms'] if wave['end_ms'] is not None else until_ms
+            while wave['next_ms'] <= min(until_ms, end_ms):
+                for _ in range(wave['count']):
+                    chunk.append((wave['next_ms'], game_rng.randrange(len(meteor_surfaces)), choice(widths),
+                                  r(50, display_width - 50), r(-250, -80), rand_uniform(-0.5, 0.5), r(150, 300),
+                                  wave['speed_multiplier'], r(20, 70), wave['score']))
+                wave['next_ms'] += self._interval(wave, wave['next_ms'])
+        chunk.sort(key=lambda entry: entry[0])
+        self.entries = self.entries[self.cursor:] + chunk; self.cursor = 0
+        self.compiled_until = until_ms; self.compiled += len(chunk)
+
+    def spawn_due(self, now_ms):
+        entries = self.entries; start = self.cursor
+        while self.cursor < len(entries) and entries[self.cursor][0] <= now_ms:
+            _, surf_index, width, x, y, heading, speed, speed_multiplier, spin, score = entries[self.cursor]
+            meteor_pool.acquire(meteor_surfaces[surf_index], (x, y), width, score,
+                                (speed + current_meteor_base_speed_offset) * speed_multiplier, heading, spin,
+                                (all_sprites, meteor_sprites))
+            self.cursor += 1
+        spawned = self.cursor - start
+        self.spawned += spawned; self.most_per_step = max(self.most_per_step, spawned)
+        if self.waves and now_ms + WAVE_HORIZON_MS / 2 > self.compiled_until:
+            self._compile(self.compiled_until + WAVE_HORIZON_MS / 2)
+
+    def stats(self):
+        return {'compiled': self.compiled, 'spawned': self.spawned, 'pending': len(self.entries) - self.cursor,
+                'most_per_step': self.most_per_step, 'prewarm_frames': self.prewarm_frames,
+                'prewarm_pending': len(self.prewarm_queue), 'prewarm_ms': round(self.prewarm_ms, 1)}
+
+wave_scheduler = WaveScheduler()
 
 # --- Game Control Functions ---
 def start_full_gameplay_systems():
-    global music_loaded_for_main_game
     global current_level_meteor_spawn_rate_multiplier
     
-    print("DEBUG: start_full_gameplay_systems called")
+    log.debug("start_full_gameplay_systems called")
+    begin_session()
     
     level_idx = current_level - 1
     current_spawn_mult = LEVEL_DATA[level_idx]['meteor_spawn_rate_multiplier']
-    
-    normal_spawn_interval = int(BASE_METEOR_SPAWN_NORMAL_INTERVAL * current_spawn_mult)
-    fast_spawn_interval = int(BASE_METEOR_SPAWN_FAST_INTERVAL * current_spawn_mult)
 
-    pygame.time.set_timer(METEOR_SPAWN_NORMAL, normal_spawn_interval)
-    pygame.time.set_timer(METEOR_SPAWN_FAST, fast_spawn_interval)
-    print(f"DEBUG: Level {current_level} - Meteor N spawn: {normal_spawn_interval}ms, F spawn: {fast_spawn_interval}ms")
-    
-    if music_loaded_for_main_game: 
-        pygame.mixer.music.play(loops=-1)
-        print("Game music started via mixer.music.")
+    if meteor_swarm.active:
+        meteor_swarm.spawning = True
+        log.debug(f"Level {current_level} - Swarm mode, ramping to {meteor_swarm.capacity} meteors over {SWARM_RAMP_SECONDS:.0f}s")
     else:
-        print("DEBUG: Main game music was not loaded, cannot play.")
-    print("Full gameplay systems started.")
+        wave_scheduler.start(LEVEL_DATA[level_idx], current_spawn_mult, current_level_meteor_speed_multiplier)
+        log.debug(f"Level {current_level} - {len(wave_scheduler.entries)} meteor spawns compiled for the next "
+              f"{WAVE_HORIZON_MS / 1000:.0f}s from {len(wave_scheduler.waves)} waves")
+    
+    if audio.play_music(loops=-1): 
+        log.info("Game music started via mixer.music.")
+    elif not audio.muted:
+        log.debug("Main game music was not loaded, cannot play.")
+    log.info("Full gameplay systems started.")
 
 def setup_game(mode="normal_start"):
-    global player,player_tail,current_score,all_sprites,meteor_sprites,laser_sprites,player_group,tail_group
+    global player,player_tail,current_score,all_sprites,meteor_sprites,laser_sprites,player_group,tail_group,score_hud
     global current_level, target_score, current_level_meteor_speed_multiplier, current_level_meteor_spawn_rate_multiplier
     global score_at_last_speed_increase, current_meteor_base_speed_offset
     
-    print(f"--- Setting up game, mode: {mode} ---")
+    log.info(f"--- Setting up game, mode: {mode} ---")
+    load_gameplay_assets()
     current_score = 0 
     score_at_last_speed_increase = 0 
     current_meteor_base_speed_offset = 0 
@@ -565,6 +2307,9 @@ def setup_game(mode="normal_start"):
     current_level_meteor_speed_multiplier = LEVEL_DATA[level_idx]['meteor_speed_multiplier']
     current_level_meteor_spawn_rate_multiplier = LEVEL_DATA[level_idx]['meteor_spawn_rate_multiplier']
 
+    for sprite in all_sprites.sprites(): sprite.kill()
+    effects.clear()
+    for pool in sprite_pools: pool.prewarm()
     all_sprites.empty();meteor_sprites.empty();laser_sprites.empty();player_group.empty();tail_group.empty()
     player_start_mode = "intro_animation" if mode=="intro_animation_setup" else "normal"
     player_instance=Spaceship(player_group,start_mode=player_start_mode)
@@ -576,212 +2321,712 @@ def setup_game(mode="normal_start"):
 
     if back_stream_frames:player_tail=Spaceshiptail(back_stream_frames,player,tail_group);all_sprites.add(player_tail)
     else: player_tail=None
-    if stars_surface:
-        star_w,star_h=stars_surface.get_width(),stars_surface.get_height()
-        if star_w>0 and star_h>0:
-            for i in range((display_width+star_w-1)//star_w):x=i*star_w;LoopingObject(stars_surface,-star_h,(x,0),20,all_sprites);LoopingObject(stars_surface,-star_h,(x,-star_h),20,all_sprites)
-    for img_path,pos,speed in planet_sprites_info:
-        try: surf=pygame.image.load(img_path).convert_alpha();LoopingObject(surf,-surf.get_height(),pos,speed,all_sprites)
-        except pygame.error as e:print(f"Planet load error {img_path}: {e}")
-    print(f"--- Game setup complete for mode: {mode} (Level: {current_level}, Target: {target_score}) ---")
+    score_hud = ScoreHud(all_sprites)
+    parallax_background.reset()
+    if meteor_swarm.active: meteor_swarm.reset(meteor_surfaces)
+    else: wave_scheduler.queue_prewarm(LEVEL_DATA[level_idx])
+    log.info(f"--- Game setup complete for mode: {mode} (Level: {current_level}, Target: {target_score}) ---")
+
+
+# --- Frame Profiler ---
+# Splits each pass of the main loop into phases: begin(phase) charges the time since the previous
+# call to the phase that was running. Frames go into a ring buffer tagged with the game state and
+# group sizes. While disabled begin() returns at once, so the markers cost next to nothing.
+PROFILER_PHASES = ('tick', 'events', 'update', 'collisions', 'video', 'draw', 'flip')
+PROFILER_HISTORY_FRAMES = 600
+PROFILER_OVERLAY_REFRESH_FRAMES = 30
+
+class FrameProfiler:
+    def __init__(self, enabled=False, capacity=PROFILER_HISTORY_FRAMES):
+        self.enabled = enabled; self.overlay_visible = False
+        self.frames = deque(maxlen=capacity); self.frame_index = 0
+        self.phase_ms = dict.fromkeys(PROFILER_PHASES, 0.0); self.phase = None; self.phase_start = 0.0
+        self.frame_state = None; self.overlay_lines = []
+
+    def begin(self, phase):
+        if not self.enabled: return None
+        now = time.perf_counter(); previous = self.phase
+        if previous: self.phase_ms[previous] += (now - self.phase_start) * 1000
+        self.phase = phase; self.phase_start = now
+        return previous
+
+    def start_frame(self, state, counts):
+        # Closes the previous frame; counts are the group sizes the finished frame ended with.
+        if not self.enabled: return
+        self.begin('tick')
+        if self.frame_state is not None:
+            times = tuple(self.phase_ms[phase] for phase in PROFILER_PHASES)
+            self.frames.append((self.frame_index, self.frame_state, counts, times))
+            self.frame_index += 1
+        self.phase_ms = dict.fromkeys(PROFILER_PHASES, 0.0); self.frame_state = state
+
+    def toggle_overlay(self):
+        self.overlay_visible = not self.overlay_visible; self.enabled = self.enabled or self.overlay_visible
+
+    def stats(self, frames=None):
+        frames = self.frames if frames is None else frames
+        if not frames: return {}
+        times = numpy.array([frame[3] for frame in frames])
+        # 'work' leaves out the tick phase, which is mostly clock.tick sleeping off the frame budget.
+        columns = list(PROFILER_PHASES) + ['total', 'work']
+        times = numpy.column_stack([times, times.sum(axis=1), times[:, 1:].sum(axis=1)])
+        p50, p95, p99 = numpy.percentile(times, [50, 95, 99], axis=0)
+        return {name: {'p50': round(float(p50[i]), 3), 'p95': round(float(p95[i]), 3), 'p99': round(float(p99[i]), 3)}
+                for i, name in enumerate(columns)}
+
+    def draw_overlay(self, surface):
+        # Bar graph of recent per-frame work against the 60 FPS budget; percentiles refresh every half second.
+        width, height, budget_ms = 360, 150, 1000 / 60
+        rect = pygame.Rect(surface.get_width() - width - 10, 10, width, height)
+        panel = pygame.Surface(rect.size); panel.fill((10, 10, 20))
+        recent = list(self.frames)[-width // 2:]
+        for i, frame in enumerate(recent):
+            work = sum(frame[3][1:]); bar_h = min(int(work / (budget_ms * 2) * 90), 90)
+            color = (90, 200, 120) if work <= budget_ms else (230, 90, 70)
+            pygame.draw.line(panel, color, (i * 2, 100), (i * 2, 100 - bar_h))
+        pygame.draw.line(panel, (200, 200, 80), (0, 55), (width, 55))
+        if self.frame_index % PROFILER_OVERLAY_REFRESH_FRAMES == 0 or not self.overlay_lines:
+            stats = self.stats(recent); work = stats.get('work', {})
+            worst = max(PROFILER_PHASES[1:], key=lambda phase: stats[phase]['p95']) if stats else '-'
+            self.overlay_lines = [profiler_overlay_font.render(line, True, (220, 220, 220)) for line in (
+                f"{self.frame_state}  work p50 {work.get('p50', 0):.1f}  p95 {work.get('p95', 0):.1f}  p99 {work.get('p99', 0):.1f} ms",
+                f"slowest p95 phase: {worst}  ({stats[worst]['p95']:.1f} ms)" if stats else "collecting...")]
+        for i, line in enumerate(self.overlay_lines): panel.blit(line, (6, 104 + i * 20))
+        surface.blit(panel, rect)
+        return rect
+
+    def dump(self, path):
+        rows = [{'frame': index, 'state': state, 'meteors': counts[0], 'lasers': counts[1], 'sprites': counts[2],
+                 **{f'{phase}_ms': round(ms, 4) for phase, ms in zip(PROFILER_PHASES, times)},
+                 'total_ms': round(sum(times), 4), 'work_ms': round(sum(times[1:]), 4)}
+                for index, state, counts, times in self.frames]
+        with open(path, 'w', newline='') as f:
+            if path.endswith('.json'): json.dump({'percentiles': self.stats(), 'frames': rows}, f, indent=1)
+            else: csv_writer = csv.DictWriter(f, fieldnames=list(rows[0]) if rows else ['frame']); csv_writer.writeheader(); csv_writer.writerows(rows)
+        log.debug(f"Wrote {len(rows)} profiled frames to {path}")
+
+frame_profiler = FrameProfiler(enabled=launch_args.profile or launch_args.profile_out is not None)
+
+# --- Gameplay Renderer ---
+# Draws the parallax background and all_sprites straight to the screen. On the surface backend a
+# scrolling background makes every frame a full repaint; over a static one only the dirty rects
+# are redrawn and presented. While the screen shakes, the frame is drawn off-screen and blitted at
+# the offset. The renderer backend redraws everything each frame and shakes by moving its origin.
+gameplay_render_target = None
+
+def snapshot_sprite_positions():
+    # Called before each fixed step so the renderer knows where every sprite came from.
+    for sprite in all_sprites: sprite.prev_center = sprite.rect.center
+
+def interpolate_sprites(alpha):
+    # Swaps each moving sprite's rect for one `alpha` of the way from its previous step to its
+    # current one, and returns the real rects for restore_sprites. The simulated rects are never
+    # modified, so drawing cannot leak into gameplay state.
+    moved = []; back = alpha - 1.0
+    if back >= 0.0: return moved
+    for sprite in all_sprites:
+        prev = getattr(sprite, 'prev_center', None)
+        if prev is None: continue
+        x, y = sprite.rect.center; dx = (x - prev[0]) * back; dy = (y - prev[1]) * back
+        if dx or dy: moved.append((sprite, sprite.rect)); sprite.rect = sprite.rect.move(dx, dy)
+    return moved
+
+def restore_sprites(moved):
+    for sprite, rect in moved: sprite.rect = rect
+
+def draw_effects(target, blits, rects):
+    # Effects sit above every sprite but the HUD, which is drawn again wherever they overlap it.
+    if not blits: return
+    target.fblits(blits)
+    if score_hud and score_hud.visible and score_hud.rect.collidelist(rects) >= 0: target.blit(score_hud.image, score_hud.rect)
+
+def draw_gameplay_layers():
+    global gameplay_render_target
+    if score_hud: score_hud.refresh()
+    alpha = sim_stepper.alpha if INTERPOLATE else 1.0
+    effect_blits, effect_rects = effects.batch(alpha)
+    if not render_backend.dirty_rects:
+        render_backend.origin = current_shake_offset; screen.fill((0,0,0))
+        if parallax_background.animated(): parallax_background.draw(screen, alpha)
+        else: screen.blit(parallax_background.still() if parallax_background.scrolling else parallax_background.base, (0, 0))
+        meteor_swarm.draw(screen, alpha)
+        moved = interpolate_sprites(alpha)
+        render_backend.draw_sprites(all_sprites)
+        restore_sprites(moved)
+        draw_effects(screen, effect_blits, effect_rects)
+        render_backend.origin = (0, 0)
+        if frame_profiler.overlay_visible: frame_profiler.draw_overlay(screen)
+        frame_profiler.begin('flip')
+        render_backend.present()
+        return
+    shaking = current_shake_offset != (0, 0)
+    target = game_render_surface if shaking else screen
+    if parallax_background.animated() or meteor_swarm.count:
+        # The swarm is drawn straight onto the background, so any frame with it is a full repaint.
+        if parallax_background.animated(): parallax_background.draw(target, alpha)
+        else: target.blit(parallax_background.still() if parallax_background.scrolling else parallax_background.base, (0, 0))
+        meteor_swarm.draw(target, alpha)
+        all_sprites.clear(target, None); all_sprites.repaint_rect(target.get_rect())
+    else:
+        all_sprites.clear(target, parallax_background.still() if parallax_background.scrolling else parallax_background.base)
+        if target is not gameplay_render_target: all_sprites.repaint_rect(target.get_rect())
+    gameplay_render_target = None if meteor_swarm.count else target
+    # Effects are drawn outside the sprite group, so the areas they covered last frame and cover
+    # now are handed to it to clear and repaint first.
+    for rect in effects.drawn_rects + effect_rects: all_sprites.repaint_rect(rect)
+    effects.drawn_rects = effect_rects
+    moved = interpolate_sprites(alpha)
+    dirty_rects = render_backend.draw_sprites(all_sprites, target)
+    restore_sprites(moved)
+    draw_effects(target, effect_blits, effect_rects)
+    if frame_profiler.overlay_visible: dirty_rects.append(frame_profiler.draw_overlay(target))
+    frame_profiler.begin('flip')
+    if shaking:
+        screen.fill((0,0,0)); screen.blit(game_render_surface, current_shake_offset); render_backend.present()
+    else:
+        render_backend.present(dirty_rects)
+
+# --- Headless Simulation ---
+headless_stats = {'ticks': 0, 'runs': 1, 'finished_scores': [], 'started': 0.0}
+
+def headless_after_tick():
+    # Runs after each headless tick; a finished run (game over or credits) restarts straight into gameplay.
+    global running
+    headless_stats['ticks'] += 1
+    if game_state != "game":
+        headless_stats['finished_scores'].append(round(current_score, 3))
+        setup_game(mode="normal_start"); scenes.switch_to("game")
+        headless_stats['runs'] += 1
+    if headless_stats['ticks'] >= launch_args.ticks: running = False
+
+def report_headless_run():
+    wall_time = max(time.perf_counter() - headless_stats['started'], 1e-9); ticks = headless_stats['ticks']
+    report_log.info(f"HEADLESS: {ticks} ticks in {wall_time:.2f}s -> {ticks / wall_time:.0f} simulated ticks/s "
+          f"(seed {game_seed}, dt {launch_args.dt:.4f}, render {launch_args.render})")
+    report_log.info(f"HEADLESS: runs {headless_stats['runs']}, finished scores {headless_stats['finished_scores']}, "
+          f"score {current_score:.3f}, meteors {len(meteor_sprites) + meteor_swarm.count}, lasers {len(laser_sprites)}, sprites {len(all_sprites)}")
+    if launch_args.render and frame_profiler.enabled:
+        percentiles = frame_profiler.stats()
+        report_log.info("RENDER: " + json.dumps({'backend': render_backend.name, 'driver': pygame.display.get_driver(), 'ticks_per_s': ticks / wall_time,
+                                       'draw': percentiles['draw'], 'flip': percentiles['flip'], **render_backend.stats()}))
+
+# --- Scenes ---
+# Every game_state is a Scene with enter/handle_event/update/draw/exit hooks and the scenes it can
+# lead to. On each transition SceneManager opens the videos and claims the sounds of the next
+# scenes on the asset loader, and drops prefetched players no next scene plays, so entering a
+# scene finds its resources ready. Transition times are tracked to spot any that still stall.
+class Scene:
+    name = None
+    next_scenes = ()
+    video_source = None  # (path, loop) of the video the scene plays
+    sounds = ()
+    fixed_step = False   # gameplay scenes update in SIM_STEP steps; the rest once per frame
+
+    def __init__(self):
+        self.player = None; self.video_opened = False
+
+    def open_player(self):
+        # Returns whether the video opened. Scenes branch on it, so like other outcomes that depend on
+        # the machine it is logged, and a replay follows the recording even if its own open differs.
+        if HEADLESS: self.video_opened = False; return False  # nothing is shown, so no decoder is started
+        path, loop = self.video_source
+        try: self.player = take_video(path, loop)
+        except Exception as e: log.error(f"Exception opening {self.name} video {path}: {e}"); self.player = None
+        if self.player and not self.player.isOpened(): self.player.release(); self.player = None
+        self.video_opened = replay_flag(self.player is not None)
+        return self.video_opened
+
+    def release_player(self):
+        if self.player: self.player.release(); self.player = None
+
+    def enter(self): pass
+    def handle_event(self, event): pass
+    def update(self, dt): pass
+
+    def draw(self):
+        # Returns True when the scene presented the frame itself.
+        return False
+
+    def exit(self):
+        self.release_player()
+
+class StartMenuScene(Scene):
+    name = "start_menu"; next_scenes = ("intro_clip_1", "intro_clip_2")
+    video_source = (VIDEO_PATH_START, True); sounds = ('start_menu',)
+
+    def enter(self):
+        if not self.open_player() and not HEADLESS: log.warning(f"Could not open start video: {VIDEO_PATH_START}")
+        audio.play('start_menu')
+
+    def handle_event(self, event):
+        if event.type == pygame.KEYDOWN and event.key == pygame.K_SPACE: scenes.switch_to("intro_clip_1")
+
+    def draw(self):
+        draw_video_frame_or_fallback(self.player, start_menu_image_surf, start_menu_rect)
+        assets_done, assets_total = asset_loader.progress()
+        if assets_done < assets_total:
+            screen.fill((40,40,60), (0, display_height - 6, display_width, 6))
+            screen.fill((120,180,255), (0, display_height - 6, display_width * assets_done // assets_total, 6))
+        return False
+
+    def exit(self):
+        audio.stop('start_menu'); self.release_player()
+
+class IntroClip1Scene(Scene):
+    name = "intro_clip_1"; next_scenes = ("intro_clip_2",); video_source = (VIDEO_PATH_INTRO_CLIP_1, False)
+
+    def enter(self):
+        if not self.open_player():
+            log.warning(f"Error opening intro_clip_1. Skipping to intro_clip_2.")
+            scenes.switch_to("intro_clip_2")
 
+    def update(self, dt):
+        if not replay_flag(draw_video_frame_or_fallback(self.player,None,None,'latest_intro_clip_1_pygame_surface')):
+            scenes.switch_to("intro_clip_2")
 
-# --- Main Game Loop ---
-if game_state=="start_menu" and start_menu_music:
-    start_menu_music.play(loops=0) 
+    def draw(self):
+        if not latest_intro_clip_1_pygame_surface: screen.fill((10,0,0))
+        return False
 
-game_render_surface = pygame.Surface((display_width,display_height))
+    def exit(self):
+        global latest_intro_clip_1_pygame_surface
+        self.release_player(); latest_intro_clip_1_pygame_surface = None
 
-while running:
-    dt = clock.tick(60)/1000
-    current_pygame_time_sec = pygame.time.get_ticks() / 1000.0
-
-    for event in pygame.event.get():
-        if event.type == pygame.QUIT: running=False
-        if game_state == "start_menu":
-            if event.type == pygame.KEYDOWN and event.key == pygame.K_SPACE:
-                if start_menu_music:start_menu_music.stop()
-                if cap_start:cap_start.set(cv2.CAP_PROP_POS_FRAMES,0)
-                try: 
-                    cap_intro_clip_1=cv2.VideoCapture(VIDEO_PATH_INTRO_CLIP_1)
-                    if not cap_intro_clip_1 or not cap_intro_clip_1.isOpened():
-                        print(f"Error opening intro_clip_1. Skipping to intro_clip_2.")
-                        cap_intro_clip_1=None;latest_intro_clip_1_pygame_surface=None;
-                        intro_clip_2_start_time=current_pygame_time_sec;game_state="intro_clip_2";
-                        if story_build_sound: story_build_sound.play() 
-                        try: cap_intro_clip_2=cv2.VideoCapture(VIDEO_PATH_INTRO_CLIP_2)
-                        except Exception as e_ic2: print(f"Err intro2 fallback: {e_ic2}"); cap_intro_clip_2=None
-                        if cap_intro_clip_2 and not cap_intro_clip_2.isOpened(): cap_intro_clip_2=None
-                    else: game_state="intro_clip_1" 
-                except Exception as e_ic1:
-                    print(f"Ex loading intro1: {e_ic1}. Skipping to intro_clip_2.")
-                    cap_intro_clip_1=None;latest_intro_clip_1_pygame_surface=None
-                    intro_clip_2_start_time=current_pygame_time_sec;game_state="intro_clip_2"
-                    if story_build_sound: story_build_sound.play()
-                    try: 
-                        cap_intro_clip_2=cv2.VideoCapture(VIDEO_PATH_INTRO_CLIP_2)
-                        if cap_intro_clip_2 and not cap_intro_clip_2.isOpened(): cap_intro_clip_2=None
-                    except Exception as e_ic2: print(f"Err intro2 ex fallback: {e_ic2}"); cap_intro_clip_2=None
-        
-        elif game_state == "display_primary_target_text":
-            if event.type == pygame.KEYDOWN and event.key == pygame.K_SPACE: 
-                print("DEBUG: Skipping Primary Target text effect, going to game_intro_animation.")
-                # Story build sound should stop if clip 2 was playing and we skip this text effect state
-                if story_build_sound and story_build_sound.get_num_channels() > 0 : story_build_sound.stop() 
-                setup_game(mode="intro_animation_setup")
-                game_intro_start_time=current_pygame_time_sec
-                game_state="game_intro_animation"
-        
-        elif game_state=="game_over":
-            if event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_ESCAPE:
-                    game_state="start_menu"
-                    if start_menu_music and start_menu_music.get_num_channels() > 0 : start_menu_music.stop() 
-                    if start_menu_music: start_menu_music.play(loops=0) 
-                    if story_build_sound and story_build_sound.get_num_channels() > 0: story_build_sound.stop() 
-                    for cap_obj in [cap_game_over, cap_intro_clip_1,cap_intro_clip_2,cap_credits_video]:
-                        if cap_obj: cap_obj.release()
-                    cap_intro_clip_1=None;cap_intro_clip_2=None;cap_credits_video=None; cap_game_over=None 
-                elif event.key == pygame.K_RETURN:
-                    # No music should be playing on game_over screen now.
-                    setup_game(mode="normal_start");game_state="game";start_full_gameplay_systems()
-        
-        elif game_state == "playing_credits_video": 
-            if event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE:
-                print("DEBUG: ESC pressed during credits video. Transitioning to start menu.")
-                if cap_credits_video: cap_credits_video.release(); cap_credits_video = None
-                if pygame.mixer.music.get_busy(): pygame.mixer.music.stop() # Stop credits music
-                game_state = "start_menu" 
-                if start_menu_music: start_menu_music.play(loops=0)
-        
-        # game_won state effectively removed
-
-        if game_state=="game":
-            if event.type==METEOR_SPAWN_NORMAL:
-                if meteor_surfaces:
-                    x,y=r(50,display_width-50),r(-250,-80);sw=r(70,110)
-                    min_h,max_h=int(sw*0.8),int(sw*1.2);sh=r(min_h,max_h) if min_h<=max_h else min_h
-                    Meteor(choice(meteor_surfaces),(x,y),(sw,sh),10, current_level_meteor_speed_multiplier, (all_sprites,meteor_sprites))
-            elif event.type==METEOR_SPAWN_FAST:
-                if meteor_surfaces:
-                    x,y=r(50,display_width-50),r(-250,-80);sw=r(50,90)
-                    min_h,max_h=int(sw*0.8),int(sw*1.2);sh=r(min_h,max_h) if min_h<=max_h else min_h
-                    m=Meteor(choice(meteor_surfaces),(x,y),(sw,sh),20, current_level_meteor_speed_multiplier, (all_sprites,meteor_sprites))
-                    m.base_speed*=1.25; m.current_speed=m.base_speed
-
-    # Game State Logic Updates
-    current_shake_offset = (0,0)
+class IntroClip2Scene(Scene):
+    name = "intro_clip_2"; next_scenes = ("display_primary_target_text",)
+    video_source = (VIDEO_PATH_INTRO_CLIP_2, False); sounds = ('story_build',)
 
-    if game_state=="intro_clip_1":
-        if not draw_video_frame_or_fallback(cap_intro_clip_1,None,None,'latest_intro_clip_1_pygame_surface'):
-            if cap_intro_clip_1:cap_intro_clip_1.release();cap_intro_clip_1=None
-            latest_intro_clip_1_pygame_surface=None
-            intro_clip_2_start_time=current_pygame_time_sec
-            game_state="intro_clip_2" 
-            if story_build_sound: story_build_sound.play() 
-            try:
-                if not cap_intro_clip_2 or not cap_intro_clip_2.isOpened():cap_intro_clip_2=cv2.VideoCapture(VIDEO_PATH_INTRO_CLIP_2)
-                if cap_intro_clip_2 and not cap_intro_clip_2.isOpened():cap_intro_clip_2=None
-            except Exception as e:print(f"Error loading intro2 video: {e}");cap_intro_clip_2=None
-    elif game_state=="intro_clip_2":
+    def enter(self):
+        global intro_clip_2_start_time
+        intro_clip_2_start_time = current_pygame_time_sec
+        audio.play('story_build')
+        self.open_player()
+
+    def update(self, dt):
         elapsed_clip_2_time=current_pygame_time_sec-intro_clip_2_start_time;clip_2_ended=False
-        if cap_intro_clip_2 and cap_intro_clip_2.isOpened():
-            if not draw_video_frame_or_fallback(cap_intro_clip_2,None,None,'latest_intro_clip_2_pygame_surface'):clip_2_ended=True
+        if self.video_opened:
+            if not replay_flag(draw_video_frame_or_fallback(self.player,None,None,'latest_intro_clip_2_pygame_surface')):clip_2_ended=True
         else:
             screen.fill((0,0,0))
-            if placeholder_font:text_surf=placeholder_font.render("Story Build Clip Playing...",True,(200,200,200));screen.blit(text_surf,text_surf.get_rect(center=(display_width/2,display_height/2)))
-        
-        story_build_channel_busy = False
-        if story_build_sound:
-            for i in range(pygame.mixer.get_num_channels()):
-                channel = pygame.mixer.Channel(i)
-                if channel.get_sound() == story_build_sound and channel.get_busy():
-                    story_build_channel_busy = True; break
-        
+            if placeholder_font:text_surf=text_cache.render(placeholder_font,"Story Build Clip Playing...",(200,200,200));screen.blit(text_surf,text_surf.get_rect(center=(display_width/2,display_height/2)))
+        story_build_channel_busy = replay_flag(audio.is_playing('story_build'))
         if (elapsed_clip_2_time>=INTRO_CLIP_2_DURATION or clip_2_ended) and not story_build_channel_busy :
-            if story_build_sound: story_build_sound.stop() 
-            if cap_intro_clip_2:cap_intro_clip_2.release();cap_intro_clip_2=None
-            latest_intro_clip_2_pygame_surface=None
-            primary_target_text_effect_start_time = current_pygame_time_sec
-            game_state = "display_primary_target_text" 
-            print("DEBUG: intro_clip_2 finished, transitioning to display_primary_target_text")
-
-    elif game_state == "display_primary_target_text":
-        elapsed_effect_time = current_pygame_time_sec - primary_target_text_effect_start_time
-        if elapsed_effect_time >= PRIMARY_TARGET_TEXT_EFFECT_DURATION:
-            print("DEBUG: Primary Target text effect finished, transitioning to game_intro_animation.")
-            setup_game(mode="intro_animation_setup")
-            game_intro_start_time=current_pygame_time_sec
-            game_state="game_intro_animation"
-            
-    elif game_state=="game_intro_animation":
+            log.debug("intro_clip_2 finished, transitioning to display_primary_target_text")
+            scenes.switch_to("display_primary_target_text")
+
+    def draw(self):
+        if self.player and not latest_intro_clip_2_pygame_surface: screen.fill((0,10,0))
+        return False
+
+    def exit(self):
+        global latest_intro_clip_2_pygame_surface
+        audio.stop('story_build'); self.release_player(); latest_intro_clip_2_pygame_surface = None
+
+class PrimaryTargetTextScene(Scene):
+    name = "display_primary_target_text"; next_scenes = ("game_intro_animation",)
+
+    def enter(self):
+        global primary_target_text_effect_start_time
+        primary_target_text_effect_start_time = current_pygame_time_sec
+
+    def handle_event(self, event):
+        if event.type == pygame.KEYDOWN and event.key == pygame.K_SPACE:
+            log.debug("Skipping Primary Target text effect, going to game_intro_animation.")
+            scenes.switch_to("game_intro_animation")
+
+    def update(self, dt):
+        if current_pygame_time_sec - primary_target_text_effect_start_time >= PRIMARY_TARGET_TEXT_EFFECT_DURATION:
+            log.debug("Primary Target text effect finished, transitioning to game_intro_animation.")
+            scenes.switch_to("game_intro_animation")
+
+    def draw(self):
+        screen.fill((0,0,0))
+        display_primary_target_text_effect(screen)
+        return False
+
+    def exit(self):
+        # Story build sound should stop if clip 2 was playing and we skip this text effect state
+        audio.stop('story_build')
+
+class GameIntroScene(Scene):
+    name = "game_intro_animation"; next_scenes = ("game",); fixed_step = True
+
+    def enter(self):
+        global game_intro_start_time
+        setup_game(mode="intro_animation_setup")
+        game_intro_start_time = current_pygame_time_sec
+
+    def update(self, dt):
         all_sprites.update(dt)
+        parallax_background.update(dt)
         if current_pygame_time_sec-game_intro_start_time>=GAME_INTRO_DURATION:
             if player:player.is_in_intro_animation=False
-            print("DEBUG: Transitioning from game_intro_animation to game state...")
-            game_state="game";start_full_gameplay_systems()
-    elif game_state=="game":
+            log.debug("Transitioning from game_intro_animation to game state...")
+            scenes.switch_to("game")
+
+    def draw(self):
+        draw_gameplay_layers()
+        return True
+
+class GameScene(Scene):
+    # Callers run setup_game() before switching here; the intro animation already did.
+    name = "game"; next_scenes = ("game_over", "playing_credits_video", "start_menu"); sounds = ('laser',); fixed_step = True
+
+    def enter(self):
+        start_full_gameplay_systems()
+
+    def exit(self):
+        wave_scheduler.stop(); end_session('quit')
+
+    def update(self, dt):
+        global current_score, display_level_start_text_timer, shake_timer, current_shake_offset
         current_score+=TIME_SCORE_RATE*dt
         if display_level_start_text_timer>0:display_level_start_text_timer-=dt # For Primary Target... text
-                
         if shake_timer > 0:
             shake_timer -= dt
             current_shake_offset = (r(-SHAKE_INTENSITY, SHAKE_INTENSITY), r(-SHAKE_INTENSITY, SHAKE_INTENSITY)) if shake_timer > 0 else (0,0)
-        
         all_sprites.update(dt)
+        effects.update(dt)
+        meteor_swarm.update(dt)
+        parallax_background.update(dt)
+        frame_profiler.begin('collisions')
         check_collisions_and_level_up()
+        frame_profiler.begin('update')
+
+    def draw(self):
+        draw_gameplay_layers()
+        return True
+
+class CreditsScene(Scene):
+    name = "playing_credits_video"; next_scenes = ("start_menu",)
+    video_source = (VIDEO_PATH_CREDITS, True); sounds = ('credits',)
+
+    def enter(self):
+        if HEADLESS: return  # a headless run ends on reaching the credits
+        level = LEVEL_DATA[current_level - 1]
+        if not self.open_player():
+            log.warning(f"Error opening credits video: {level.get('credits_video_path')}. Returning to start menu.")
+            scenes.switch_to("start_menu"); return
+        if level.get('credits_music_path'):
+            if audio.crossfade('credits'): log.debug(f"Crossfading to credits music: {level['credits_music_path']}")
+            else: log.error(f"Error playing credits music {level['credits_music_path']}")
+
+    def handle_event(self, event):
+        if event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE:
+            log.debug("ESC pressed during credits video. Transitioning to start menu.")
+            scenes.switch_to("start_menu")
 
-    elif game_state == "playing_credits_video": 
-        if not draw_video_frame_or_fallback(cap_credits_video, None, None, loop=True): 
-            print("DEBUG: Credits video non-looping end OR error. Transitioning to start menu.")
-            if cap_credits_video: cap_credits_video.release(); cap_credits_video = None
-            if pygame.mixer.music.get_busy(): pygame.mixer.music.stop() 
-            game_state = "start_menu" 
-            if start_menu_music: start_menu_music.play(loops=0)
-            
-    elif game_state == "game_won": # No longer directly used, game ends after credits.
-        print("DEBUG: In game_won state (should be rare). Transitioning to start menu.")
-        game_state = "start_menu" 
-        if start_menu_music: start_menu_music.play(loops=0)
-
-
-    # --- Drawing Section ---
-    game_render_surface.fill((0,0,0,0));game_render_surface.set_colorkey((0,0,0))
-
-    if game_state=="start_menu":draw_video_frame_or_fallback(cap_start,start_menu_image_surf,start_menu_rect,loop=True)
-    elif game_state == "display_primary_target_text":
-        screen.fill((0,0,0)) 
-        display_primary_target_text_effect(screen) 
-    elif game_state=="intro_clip_1": _ = screen.fill((10,0,0)) if not latest_intro_clip_1_pygame_surface else None
-    elif game_state=="intro_clip_2":
-        if not(cap_intro_clip_2 and cap_intro_clip_2.isOpened()) and not latest_intro_clip_2_pygame_surface:pass
-        elif latest_intro_clip_2_pygame_surface:pass
-        else:screen.fill((0,10,0))
-    elif game_state=="game_intro_animation" or game_state=="game":
-        _ = game_render_surface.blit(background,(0,0)) if background else game_render_surface.fill((0,0,10))
-        all_sprites.draw(game_render_surface)
-        if 'player_tail' in globals() and player_tail and player_tail.alive():game_render_surface.blit(player_tail.image,player_tail.rect)
-        if 'player' in globals() and player and player.alive():game_render_surface.blit(player.image,player.rect)
-        if game_state=="game":
-            display_score(game_render_surface)
-            # "Primary Target" text now handled by display_primary_target_text state, so no other level start message needed for level 1
-        screen.blit(game_render_surface,current_shake_offset)
-    elif game_state=="playing_credits_video": 
-        if not cap_credits_video or not cap_credits_video.isOpened(): 
-            screen.fill((10,10,30)) 
+    def update(self, dt):
+        if not replay_flag(draw_video_frame_or_fallback(self.player, None, None)):
+            log.debug("Credits video non-looping end OR error. Transitioning to start menu.")
+            scenes.switch_to("start_menu")
+
+    def draw(self):
+        if not self.player:
+            screen.fill((10,10,30))
             if placeholder_font:
-                text_surf = placeholder_font.render("Playing Credits...",True,(200,200,255))
+                text_surf = text_cache.render(placeholder_font,"Playing Credits...",(200,200,255))
                 screen.blit(text_surf, text_surf.get_rect(center=(display_width/2, display_height/2)))
-    elif game_state == "game_won": # This state is no longer drawn as game goes to menu after credits.
-        pass 
-    elif game_state=="game_over":
+        return False
+
+    def exit(self):
+        audio.stop('credits'); self.release_player()
+
+class GameOverScene(Scene):
+    name = "game_over"; next_scenes = ("game", "start_menu"); video_source = (VIDEO_PATH_GAME_OVER, True)
+
+    def enter(self):
         # Screen should be silent for game_over video display
-        draw_video_frame_or_fallback(cap_game_over,None,None,loop=True) 
-    pygame.display.flip()
-
-# --- Release Resources ---
-for cap_obj in [cap_start,cap_intro_clip_1,cap_intro_clip_2,cap_game_over,cap_credits_video]:
-    if cap_obj: cap_obj.release()
-pygame.mixer.quit()
-pygame.quit()
-sys.exit()
\ No newline at end of file
+        self.open_player()
+
+    def handle_event(self, event):
+        if event.type != pygame.KEYDOWN: return
+        if event.key == pygame.K_ESCAPE: scenes.switch_to("start_menu")
+        elif event.key == pygame.K_RETURN:
+            setup_game(mode="normal_start"); scenes.switch_to("game")
+
+    def draw(self):
+        draw_video_frame_or_fallback(self.player,None,None)
+        return False
+
+class SceneManager:
+    def __init__(self, *scene_list):
+        self.scenes = {scene.name: scene for scene in scene_list}; self.current = None
+        self.transitions = 0; self.transition_ms = 0.0; self.worst_transition = (0.0, None)
+
+    def switch_to(self, name):
+        global game_state
+        start = time.perf_counter()
+        if self.current: self.current.exit()
+        scene = self.current = self.scenes[name]; game_state = name
+        scene.enter()
+        if self.current is not scene: return  # enter() fell through to another scene, which has prefetched
+        self.prefetch()
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        self.transitions += 1; self.transition_ms += elapsed_ms
+        if elapsed_ms > self.worst_transition[0]: self.worst_transition = (elapsed_ms, name)
+
+    def prefetch(self):
+        if HEADLESS: return  # headless scenes open no videos and play no sounds
+        wanted = {}
+        for next_name in self.current.next_scenes:
+            next_scene = self.scenes[next_name]
+            if next_scene.video_source: wanted[f"video:{next_scene.video_source[0]}"] = next_scene.video_source
+            for sound in next_scene.sounds: audio.prefetch(sound)
+        for job_name in asset_loader.names("video:"):
+            if job_name not in wanted: asset_loader.discard(job_name)
+        for job_name, (path, loop) in wanted.items(): asset_loader.submit(job_name, open_video, path, loop)
+
+    def release(self):
+        for scene in self.scenes.values(): scene.release_player()
+
+    def stats(self):
+        return {'transitions': self.transitions, 'mean_ms': round(self.transition_ms / max(self.transitions, 1), 2),
+                'worst_ms': round(self.worst_transition[0], 2), 'worst_scene': self.worst_transition[1]}
+
+scenes = SceneManager(StartMenuScene(), IntroClip1Scene(), IntroClip2Scene(), PrimaryTargetTextScene(),
+                      GameIntroScene(), GameScene(), CreditsScene(), GameOverScene())
+
+# --- Simulation Step ---
+game_render_surface = pygame.Surface((display_width,display_height))
+frame_work_started = time.perf_counter(); render_backend.present_ms = 0.0
+
+def simulate(step):
+    # One update of the current scene: advances the simulation clock, spawns due meteors, updates.
+    global sim_clock_ms, current_pygame_time_sec, current_shake_offset
+    sim_clock_ms += step * 1000
+    current_pygame_time_sec = sim_clock_ms / 1000.0
+    scene = scenes.current
+    if scene.fixed_step: snapshot_sprite_positions()
+    if wave_scheduler.active: wave_scheduler.spawn_due(sim_clock_ms)
+    current_shake_offset = (0,0)
+    scene.update(step)
+
+# --- Environment API ---
+# GameEnv drives the `game` scene one fixed step at a time for agents: reset(seed) starts a seeded
+# run, step(action) applies an action bitmask (bit i holds REPLAY_KEYS[i], as in the replay log) and
+# returns (observation, reward, done, info) with the score gained as the reward. The observation is
+# optional: a (3, height, width) uint8 raster of meteors, lasers and the player at a reduced size.
+# The game state is module-level, so a process hosts one game; VectorEnv runs N of them in worker
+# processes that write observations straight into one shared-memory array.
+ENV_OBS_SIZE = (128, 72)
+
+class ActionInput:
+    # Stand-in for pygame.key that reports the keys set in the current action.
+    key_bits = {key: 1 << i for i, key in enumerate(REPLAY_KEYS)}
+
+    def __init__(self):
+        self.action = 0
+
+    def get_pressed(self):
+        return self
+
+    def __getitem__(self, key):
+        return bool(self.action & self.key_bits.get(key, 0))
+
+class GameEnv:
+    def __init__(self, obs_size=None, obs_buffer=None):
+        self.obs_size = obs_size; self.input = ActionInput(); self.score = 0.0
+        self.obs = obs_buffer if obs_buffer is not None else (
+            numpy.zeros((3, obs_size[1], obs_size[0]), numpy.uint8) if obs_size else None)
+
+    def reset(self, seed=None):
+        global input_source, sim_clock_ms, current_pygame_time_sec, shake_timer
+        if seed is not None: game_rng.seed(seed)
+        input_source = self.input; self.input.action = 0
+        sim_clock_ms = 0.0; current_pygame_time_sec = 0.0; shake_timer = 0.0
+        setup_game(mode="normal_start"); scenes.switch_to("game")
+        self.score = current_score
+        return self.observe()
+
+    def step(self, action):
+        self.input.action = int(action)
+        simulate(SIM_STEP)
+        reward = current_score - self.score; self.score = current_score
+        return self.observe(), reward, game_state != "game", {'score': current_score, 'state': game_state}
+
+    def observe(self):
+        if self.obs is None: return None
+        obs = self.obs; obs.fill(0); height, width = obs.shape[1:]
+        sx = width / display_width; sy = height / display_height
+        for channel, group in enumerate((meteor_sprites, laser_sprites, player_group)):
+            for sprite in group:
+                rect = sprite.rect
+                obs[channel, max(int(rect.top * sy), 0):max(int(rect.bottom * sy) + 1, 0),
+                    max(int(rect.left * sx), 0):max(int(rect.right * sx) + 1, 0)] = 255
+        if meteor_swarm.count:
+            cells = (meteor_swarm.pos[:meteor_swarm.count] * (sx, sy)).astype(numpy.intp)
+            visible = (cells[:, 0] >= 0) & (cells[:, 0] < width) & (cells[:, 1] >= 0) & (cells[:, 1] < height)
+            obs[0, cells[visible, 1], cells[visible, 0]] = 255
+        return obs
+
+def _env_worker(conn, index, obs_name, obs_shape):
+    # Runs in a spawned process, which imported this file headless; finished runs reset themselves.
+    obs_memory = shared_memory.SharedMemory(name=obs_name) if obs_name else None
+    obs_buffer = numpy.ndarray(obs_shape, numpy.uint8, buffer=obs_memory.buf)[index] if obs_memory else None
+    env = GameEnv((obs_shape[3], obs_shape[2]) if obs_memory else None, obs_buffer)
+    # Until the parent sends a seeded reset, worker i plays seeds i, i + N, ... so a step is always valid.
+    seed_stride = obs_shape[0]; env.reset(index); next_seed = index + seed_stride
+    try:
+        while True:
+            command, value = conn.recv()
+            if command == 'step':
+                _, reward, done, info = env.step(value)
+                if done: env.reset(next_seed); next_seed += seed_stride
+                conn.send((reward, done, info['score']))
+            elif command == 'reset':
+                seed = next_seed if value is None else value
+                env.reset(seed); next_seed = seed + seed_stride
+                conn.send(None)
+            else: break
+    finally:
+        env.obs = obs_buffer = None
+        if obs_memory: obs_memory.close()
+        conn.close(); stop_logging()
+
+class VectorEnv:
+    # N GameEnv workers stepped in lockstep. observations is a (N, 3, height, width) view of the
+    # shared buffer and changes in place on every reset and step.
+    def __init__(self, num_envs, obs_size=ENV_OBS_SIZE):
+        self.num_envs = num_envs; context = multiprocessing.get_context('spawn')
+        obs_shape = (num_envs, 3, obs_size[1], obs_size[0]) if obs_size else (num_envs,)
+        self.obs_memory = shared_memory.SharedMemory(create=True, size=int(numpy.prod(obs_shape))) if obs_size else None
+        self.observations = numpy.ndarray(obs_shape, numpy.uint8, buffer=self.obs_memory.buf) if obs_size else None
+        self.conns = []; self.workers = []
+        for index in range(num_envs):
+            parent_conn, child_conn = context.Pipe()
+            worker = context.Process(target=_env_worker, name=f"astroburst-env-{index}", daemon=True,
+                                     args=(child_conn, index, self.obs_memory.name if obs_size else None, obs_shape))
+            worker.start(); child_conn.close()
+            self.conns.append(parent_conn); self.workers.append(worker)
+        self.rewards = numpy.zeros(num_envs, numpy.float32); self.dones = numpy.zeros(num_envs, bool)
+        self.scores = numpy.zeros(num_envs, numpy.float32)
+
+    def reset(self, seed=0):
+        # Env i starts from seed + i; a finished run restarts on its next seed, num_envs further on.
+        # With seed None each env moves on to its next seed.
+        for index, conn in enumerate(self.conns): conn.send(('reset', None if seed is None else seed + index))
+        for conn in self.conns: conn.recv()
+        return self.observations
+
+    def step(self, actions):
+        for conn, action in zip(self.conns, actions): conn.send(('step', int(action)))
+        for index, conn in enumerate(self.conns):
+            self.rewards[index], self.dones[index], self.scores[index] = conn.recv()
+        return self.observations, self.rewards, self.dones, self.scores
+
+    def close(self):
+        for conn in self.conns:
+            try: conn.send(('close', None))
+            except (BrokenPipeError, OSError): pass
+        for worker in self.workers: worker.join(timeout=5)
+        self.observations = None
+        if self.obs_memory: self.obs_memory.close(); self.obs_memory.unlink(); self.obs_memory = None
+
+def run_env_bench(steps):
+    cpus = os.cpu_count() or 1
+    counts = sorted({1, cpus} | {2 ** i for i in range(1, cpus.bit_length()) if 2 ** i <= cpus})
+    report_log.info(f"ENV BENCH: {steps} steps per env, observation {ENV_OBS_SIZE[0]}x{ENV_OBS_SIZE[1]}, {cpus} CPUs")
+    action_rng = numpy.random.default_rng(0); baseline = None
+    for count in counts:
+        vector_env = VectorEnv(count)
+        try:
+            vector_env.reset(0); actions = action_rng.integers(0, 1 << len(REPLAY_KEYS), (steps, count))
+            start = time.perf_counter()
+            for step_actions in actions: vector_env.step(step_actions)
+            rate = steps * count / (time.perf_counter() - start)
+        finally: vector_env.close()
+        baseline = baseline or rate
+        report_log.info(f"ENV BENCH: {count:>3} envs -> {rate:>8.0f} steps/s ({rate / baseline / count:.0%} of linear scaling)")
+
+# --- Main Game Loop ---
+def run_game():
+    global running, frame_work_started, gameplay_render_target
+    if HEADLESS:
+        setup_game(mode="normal_start"); scenes.switch_to("game")
+        headless_stats['started'] = time.perf_counter()
+    else:
+        scenes.switch_to("start_menu")
+    log.debug(f"Start menu ready {(time.perf_counter() - program_start_time) * 1000:.0f} ms after launch")
+
+    while running:
+        frame_profiler.start_frame(game_state, (len(meteor_sprites) + meteor_swarm.count, len(laser_sprites), len(all_sprites)))
+        if HEADLESS or REPLAY_UNCAPPED: dt = launch_args.dt
+        else:
+            frame_work_ms = (time.perf_counter() - frame_work_started) * 1000
+            # With vsync, present blocks until vblank; that wait is not work the tiers can shed.
+            if render_backend.vsync: frame_work_ms -= render_backend.present_ms
+            render_backend.present_ms = 0.0
+            dt = clock.tick(launch_args.max_fps)/1000; frame_work_started = time.perf_counter()
+            quality.observe(frame_work_ms)
+        if session: session['frame_ms'].append(dt * 1000)
+        if replay_log:
+            dt = replay_log.frame(game_state, dt)
+            if dt is None: break
+        frame_profiler.begin('events')
+        if scripted_input: scripted_input.advance()
+
+        for event in (replay_log.events(pygame.event.get()) if replay_log else pygame.event.get()):
+            if event.type == pygame.QUIT: running=False
+            if event.type == pygame.KEYDOWN and event.key == pygame.K_F3:
+                frame_profiler.toggle_overlay(); gameplay_render_target = None
+            scenes.current.handle_event(event)
+
+        # Game State Logic Updates
+        frame_profiler.begin('update')
+        if scenes.current.fixed_step:
+            for _ in range(sim_stepper.advance(dt)):
+                simulate(sim_stepper.step)
+                if not scenes.current.fixed_step: break
+        else:
+            sim_stepper.reset(); simulate(dt)
+        if wave_scheduler.prewarm_queue: wave_scheduler.prewarm(WAVE_PREWARM_BUDGET_MS)
+        if text_cache.pending: text_cache.render_pending(TEXT_LADDER_BUDGET_MS)
+
+        if HEADLESS:
+            headless_after_tick()
+            if not launch_args.render: continue
+        if REPLAY_UNCAPPED: continue
+
+        # --- Drawing Section ---
+        frame_profiler.begin('draw')
+        if scenes.current.draw(): continue
+        gameplay_render_target = None
+        if frame_profiler.overlay_visible: frame_profiler.draw_overlay(screen)
+        frame_profiler.begin('flip')
+        render_backend.present()
+
+    # --- Release Resources ---
+    end_session('quit')
+    if HEADLESS: report_headless_run()
+    if replay_log: replay_log.finish(game_state, (current_score, len(meteor_sprites) + meteor_swarm.count, len(laser_sprites), len(all_sprites)))
+    asset_loader.shutdown()
+    if frame_profiler.enabled:
+        frame_profiler.start_frame(None, (len(meteor_sprites) + meteor_swarm.count, len(laser_sprites), len(all_sprites)))
+        log.debug(f"Frame time percentiles (ms): {frame_profiler.stats()}")
+        if launch_args.profile_out: frame_profiler.dump(launch_args.profile_out)
+    log.debug(f"Asset loader wait times (ms): { {name: round(ms, 1) for name, ms in asset_loader.wait_times.items()} }")
+    log.debug(f"Asset cache stats: {asset_cache.stats()}")
+    if asset_pack: log.debug(f"Asset pack stats: {asset_pack.stats()}")
+    log.debug(f"Rotation cache stats: {rotation_cache.stats()}")
+    log.debug(f"Wave scheduler stats: {wave_scheduler.stats()}")
+    log.debug(f"Effect stats: {effects.stats()}")
+    log.debug(f"Collision broadphase stats: {collision_grid.stats()}")
+    log.debug(f"Text cache stats: {text_cache.stats()}")
+    log.debug(f"Audio blocking calls: {audio.stats()}")
+    log.debug(f"Scene transition stats: {scenes.stats()}")
+    log.debug(f"Fixed timestep stats: {sim_stepper.stats()}")
+    log.debug(f"Quality governor stats: {quality.stats()}")
+    if meteor_swarm.active: log.debug(f"Meteor swarm stats: {meteor_swarm.stats()}")
+    log.debug(f"Sprite pool stats: { {pool.sprite_class.__name__: pool.stats() for pool in sprite_pools} }")
+    if session_store:
+        session_store.close(); log.debug(f"Session store stats: {session_store.stats()}")
+    scenes.release()
+    pygame.mixer.quit()
+    pygame.quit()
+    sys.exit()
+
+if __name__ == '__main__':
+    if launch_args.bake_assets: sys.exit(0 if bake_asset_pack(ASSET_PACK_PATH) else 1)
+    elif launch_args.env_bench: run_env_bench(launch_args.env_bench)
+    else: run_game()